@@ -1,5 +1,59 @@
 import asyncio
-from typing import Any
+from collections import namedtuple
+from typing import Any, List
+
+import numpy as np
+
+# Flat record for one agent finding: strength is normalized to 0-1 and text
+# is None when the finding has no usable description
+Finding = namedtuple("Finding", "strength is_positive text agent")
+
+
+def normalize_findings(result: Any, agent: str) -> List[Finding]:
+    """
+    Convert the ``findings`` dicts of an agent result into Finding records.
+    Results without a findings list, and non-dict findings, are skipped.
+
+    A result may also carry ``findings_soa``: a ``(strengths, is_positive)``
+    pair of arrays aligned with ``findings`` (strengths on the 0-100 scale).
+    When present, strengths and signs are converted in bulk instead of being
+    parsed from each dict.
+    """
+    if not isinstance(result, dict):
+        return []
+    findings = result.get("findings")
+    if not isinstance(findings, list):
+        return []
+
+    soa = result.get("findings_soa")
+    if soa is not None and len(soa) == 2 and len(soa[0]) == len(soa[1]) == len(findings):
+        strengths = (np.asarray(soa[0], dtype=np.float64) / 100.0).tolist()
+        positives = np.asarray(soa[1], dtype=bool).tolist()
+        records = []
+        for finding, strength, is_positive in zip(findings, strengths, positives):
+            if isinstance(finding, dict):
+                text = finding.get("finding") or finding.get("description")
+                records.append(Finding(strength, is_positive, text if isinstance(text, str) else None, agent))
+        return records
+
+    records = []
+    for finding in findings:
+        if not isinstance(finding, dict):
+            continue
+        # Normalize evidence strength 0-100 -> 0-1
+        try:
+            strength = float(finding.get("evidence_strength", 50)) / 100.0
+        except (TypeError, ValueError):
+            strength = 0.5  # default
+        text = finding.get("finding") or finding.get("description")
+        records.append(Finding(
+            strength,
+            bool(finding.get("is_positive", True)),
+            text if isinstance(text, str) else None,
+            agent,
+        ))
+    return records
+
 
 class BaseAgent:
     """Base class to provide async support for all agents."""
@@ -15,6 +69,7 @@ class BaseAgent:
         """
         Async wrapper for the synchronous analyze() method.
         Uses asyncio.to_thread() to run blocking code without blocking event loop.
+        No timeout is applied here: MasterAgent bounds each agent with its
+        AGENT_TIMEOUTS entry.
         """
-        loop = asyncio.get_running_loop()
-        return await asyncio.wait_for(loop.run_in_executor(None, self.analyze, *args, **kwargs), timeout=30)
+        return await asyncio.to_thread(self.analyze, *args, **kwargs)
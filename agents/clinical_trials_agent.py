@@ -6,12 +6,12 @@ Summarizes active trial counts, phase distribution, and sponsor insights.
 """
 
 from __future__ import annotations
+import asyncio
 import os
 import json
 import re
-import time
 from typing import Dict, Any, List, Optional
-import requests
+import httpx
 from bs4 import BeautifulSoup
 from urllib.parse import quote_plus
 from datetime import datetime
@@ -20,6 +20,11 @@ from dotenv import load_dotenv
 import google.generativeai as genai
 from .base_agent import BaseAgent
 
+# Patterns used to locate fields inside each study card, compiled once
+PHASE_PATTERN = re.compile(r'Phase \d', re.IGNORECASE)
+STATUS_CLASS_PATTERN = re.compile(r'status')
+START_DATE_PATTERN = re.compile(r'Start Date', re.IGNORECASE)
+
 
 class ClinicalTrialsAgent(BaseAgent):
     """
@@ -61,6 +66,14 @@ class ClinicalTrialsAgent(BaseAgent):
         else:
             return await self.analyze_with_gemini(molecule_name, disease_name)
 
+    def _new_client(self) -> httpx.AsyncClient:
+        """
+        AsyncClient for the single search request of one analysis, used as
+        `async with` so it is closed on the event loop that opened it (the
+        app runs each analysis under a fresh asyncio.run()).
+        """
+        return httpx.AsyncClient(headers=self.headers, timeout=30.0)
+
     async def scrape_clinical_trials(self, molecule_name: str, disease_name: str) -> Dict[str, Any]:
         """
         Scrape clinical trial data from ClinicalTrials.gov.
@@ -80,20 +93,16 @@ class ClinicalTrialsAgent(BaseAgent):
         }
         print(f"[INFO] 🕷️ SCRAPING ClinicalTrials.gov for {molecule_name} + {disease_name}") 
         try:
-            # Add random delay to avoid rate limiting
-            time.sleep(2 + random.uniform(0, 1))
+            # Add random delay to avoid rate limiting (without blocking the loop)
+            await asyncio.sleep(2 + random.uniform(0, 1))
             
             # Make the request
-            response = requests.get(
-                self.base_url,
-                params=params,
-                headers=self.headers,
-                timeout=30
-            )
+            async with self._new_client() as client:
+                response = await client.get(self.base_url, params=params)
             response.raise_for_status()
 
             # Parse the HTML
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = BeautifulSoup(response.text, 'lxml')
             
             # Extract trial data
             trials = []
@@ -106,19 +115,19 @@ class ClinicalTrialsAgent(BaseAgent):
                     
                     # Extract phase
                     phase = "Not specified"
-                    phase_elem = card.find('span', string=re.compile(r'Phase \d', re.IGNORECASE))
+                    phase_elem = card.find('span', string=PHASE_PATTERN)
                     if phase_elem:
                         phase = phase_elem.get_text(strip=True)
                     
                     # Extract status
                     status = "Status not available"
-                    status_elem = card.find('span', class_=re.compile(r'status'))
+                    status_elem = card.find('span', class_=STATUS_CLASS_PATTERN)
                     if status_elem:
                         status = status_elem.get_text(strip=True)
                     
                     # Extract start date
                     start_date = "Start date not available"
-                    date_elem = card.find('span', string=re.compile(r'Start Date', re.IGNORECASE))
+                    date_elem = card.find('span', string=START_DATE_PATTERN)
                     if date_elem and date_elem.find_next_sibling('span'):
                         start_date = date_elem.find_next_sibling('span').get_text(strip=True)
                     
@@ -139,7 +148,7 @@ class ClinicalTrialsAgent(BaseAgent):
             
             return analysis
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             raise RuntimeError(f"Failed to fetch clinical trials data: {str(e)}")
         except Exception as e:
             raise RuntimeError(f"Error processing clinical trials data: {str(e)}")
@@ -19,7 +19,8 @@ from visualization_components import (
     create_risk_radar,
     create_timeline_gantt,
     create_market_funnel,
-    export_dashboard
+    export_dashboard,
+    render_dashboard
 )
 from utils.competitor_dashboard import render_competitor_dashboard
 from utils.patent_network import render_patent_network
@@ -829,16 +830,26 @@ else:  # Compare Molecules
 # ======================================================================================
 # INITIALIZE MASTER AGENT
 # ======================================================================================
-master_agent = MasterAgent()
+master_agent = MasterAgent(cache_dir="data/cache")
 
 # Initialize session state for loaded analysis
 if "loaded_analysis" not in st.session_state:
     st.session_state.loaded_analysis = None
 
+# Results of the last run are kept so that switching result views (which
+# reruns the script) does not require the analysis to be run again.
+analysis_key = (analysis_mode, tuple(molecules), disease_name)
+current_analysis = st.session_state.get("current_analysis")
+reuse_results = (
+    not analyze_button
+    and current_analysis is not None
+    and current_analysis["key"] == analysis_key
+)
+
 # ======================================================================================
 # RUN ANALYSIS
 # ======================================================================================
-if analyze_button or st.session_state.get("loaded_analysis"):
+if analyze_button or reuse_results or st.session_state.get("loaded_analysis"):
     # Use loaded analysis data if available
     if st.session_state.loaded_analysis:
         loaded_data = st.session_state.loaded_analysis
@@ -1029,20 +1040,25 @@ if analyze_button or st.session_state.get("loaded_analysis"):
             # Get final results
             return await analysis_task
 
-        # Run analysis
-        all_results = asyncio.run(run_analysis())
-        
-        # Save the analysis automatically
-        if "loaded_analysis" not in st.session_state:  # Only auto-save new analyses
-            analysis_id = generate_analysis_id(molecule_name, disease_name)
-            analysis_data = {
-                "id": analysis_id,
-                "molecule_name": molecule_name,
-                "disease_name": disease_name,
-                "timestamp": str(int(datetime.now().timestamp())),
-                "results": all_results
-            }
-            save_analysis(analysis_data)
+        if reuse_results:
+            all_results = current_analysis["results"]
+            progress_bar.progress(100)
+        else:
+            # Run analysis
+            all_results = asyncio.run(run_analysis())
+            st.session_state.current_analysis = {"key": analysis_key, "results": all_results}
+
+            # Save the analysis automatically
+            if "loaded_analysis" not in st.session_state:  # Only auto-save new analyses
+                analysis_id = generate_analysis_id(molecule_name, disease_name)
+                analysis_data = {
+                    "id": analysis_id,
+                    "molecule_name": molecule_name,
+                    "disease_name": disease_name,
+                    "timestamp": str(int(datetime.now().timestamp())),
+                    "results": all_results
+                }
+                save_analysis(analysis_data)
         
         st.success("✅ Analysis Complete! Review your results below.")
         
@@ -1083,19 +1099,28 @@ if analyze_button or st.session_state.get("loaded_analysis"):
         # ======================================================================================
         # RESULTS SECTION WITH TABS
         # ======================================================================================
-        tabs = st.tabs([
-            "📊 Executive Summary", 
+        # Only the selected view is rendered; st.tabs would build every tab
+        # body on each rerun even though just one is visible.
+        result_views = [
+            "📊 Executive Summary",
             "📈 Dashboard",
-            "🔍 Detailed Analysis", 
-            "⚠️ Risk Assessment", 
+            "🔍 Detailed Analysis",
+            "⚠️ Risk Assessment",
             "⚔️ Competitive Intel",
-            "�️ Patent Landscape",
-            "�💬 Deep Dive",
+            "🕸️ Patent Landscape",
+            "💬 Deep Dive",
             "📄 Download Report"
-        ])
-        
+        ]
+        selected_view = st.radio(
+            "View",
+            result_views,
+            horizontal=True,
+            label_visibility="collapsed",
+            key="result_view"
+        )
+
         # ==================== TAB 0: EXECUTIVE SUMMARY ====================
-        with tabs[0]:
+        if selected_view == result_views[0]:
             if analysis_mode == "Single Molecule":
                 st.markdown('<div class="glass-card">', unsafe_allow_html=True)
                 st.markdown(f"### 🎯 Recommendation for {molecule_name}")
@@ -1151,7 +1176,7 @@ if analyze_button or st.session_state.get("loaded_analysis"):
                 st.markdown(rec_html, unsafe_allow_html=True)
                 
                 # Agent confidence visualization
-                agent_confidences = synthesis.get('agent_confidences', [])
+                agent_confidences = master_agent.as_rows(synthesis.get('agent_confidences', []))
                 if agent_confidences:
                     st.markdown("### 🔍 Analysis Confidence")
                     st.markdown("Confidence levels from each analysis agent:")
@@ -1383,32 +1408,20 @@ if analyze_button or st.session_state.get("loaded_analysis"):
                 st.markdown('</div>', unsafe_allow_html=True)
 
         # ==================== TAB 1: DASHBOARD ====================
-        with tabs[1]:
+        if selected_view == result_views[1]:
             if analysis_mode == "Single Molecule" and hasattr(st.session_state, 'visualizations') and st.session_state.visualizations:
                 st.markdown('<div class="glass-card">', unsafe_allow_html=True)
                 st.markdown("### 📊 Interactive Dashboard")
                 
-                # Create two columns for the top row
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.plotly_chart(st.session_state.visualizations['risk_radar'], use_container_width=True)
-                
-                with col2:
-                    st.plotly_chart(st.session_state.visualizations['market_funnel'], use_container_width=True)
-                
-                # Full width for the timeline
-                st.plotly_chart(st.session_state.visualizations['timeline_gantt'], use_container_width=True)
+                # All three charts in one component: one element for
+                # Streamlit to send and mount instead of three
+                render_dashboard(st.session_state.visualizations)
                 
                 # Add export button
                 if st.button("💾 Export Dashboard as HTML", use_container_width=True, key="export_dashboard"):
                     # Create a temporary file path
                     export_path = export_dashboard(
-                        {
-                            "risk_radar": st.session_state.visualizations['risk_radar'],
-                            "market_funnel": st.session_state.visualizations['market_funnel'],
-                            "timeline_gantt": st.session_state.visualizations['timeline_ganant']
-                        },
+                        st.session_state.visualizations,
                         filename=f"{molecule_name.replace(' ', '_')}_dashboard.html"
                     )
                     
@@ -1425,7 +1438,7 @@ if analyze_button or st.session_state.get("loaded_analysis"):
                 st.warning("No visualization data available. Please run the analysis first.")
 
         # ==================== TAB 2: DETAILED ANALYSIS ====================
-        with tabs[2]:
+        if selected_view == result_views[2]:
             st.markdown('<div class="glass-card">', unsafe_allow_html=True)
             st.markdown("### 🔍 Detailed Analysis")
             
@@ -1437,35 +1450,46 @@ if analyze_button or st.session_state.get("loaded_analysis"):
                     "market_analysis": "📈 Market Analysis",
                     "safety_analysis": "⚠️ Safety Profile"
                 }
-                
+
+                # Checked once rather than per finding
+                has_evidence_badge = hasattr(master_agent, 'get_evidence_badge')
+
                 for agent_key, agent_title in agent_sections.items():
                     if agent_key in all_results:
                         agent_data = all_results[agent_key]
-                        
+
                         with st.expander(agent_title, expanded=False):
                             if isinstance(agent_data, dict) and 'findings' in agent_data:
                                 for finding in agent_data['findings']:
+                                    # Unpack the fixed keys once per finding
+                                    f_text = finding.get('finding', '')
+                                    f_impl = finding.get('implications')
+                                    f_reco = finding.get('recommendation')
+                                    f_src = finding.get('sources') or ()
+                                    f_score = finding.get('evidence_strength', 0)
+
                                     # Display finding with evidence badge
                                     col1, col2 = st.columns([4, 1])
                                     with col1:
-                                        st.markdown(f"**Finding:** {finding.get('finding', '')}")
-                                        if 'implications' in finding:
-                                            st.markdown(f"*Implications:* {finding['implications']}")
-                                        if 'recommendation' in finding:
-                                            st.markdown(f"*Recommendation:* {finding['recommendation']}")
-                                        
+                                        st.markdown(f"**Finding:** {f_text}")
+                                        if f_impl is not None:
+                                            st.markdown(f"*Implications:* {f_impl}")
+                                        if f_reco is not None:
+                                            st.markdown(f"*Recommendation:* {f_reco}")
+
                                         # Display sources if available
-                                        if 'sources' in finding and finding['sources']:
+                                        if f_src:
                                             with st.expander("View Sources", expanded=False):
-                                                for src in finding['sources']:
-                                                    st.markdown(f"- {src.get('type', 'Source').title()}: {src.get('url', 'No URL')}")
-                                    
+                                                st.markdown("\n".join(
+                                                    f"- {src.get('type', 'Source').title()}: {src.get('url', 'No URL')}"
+                                                    for src in f_src
+                                                ))
+
                                     with col2:
                                         # Display evidence strength badge
-                                        score = finding.get('evidence_strength', 0)
-                                        if hasattr(master_agent, 'get_evidence_badge'):
+                                        if has_evidence_badge:
                                             st.markdown(
-                                                master_agent.get_evidence_badge(score),
+                                                master_agent.get_evidence_badge(f_score),
                                                 unsafe_allow_html=True
                                             )
                                     
@@ -1501,7 +1525,7 @@ if analyze_button or st.session_state.get("loaded_analysis"):
             st.markdown('</div>', unsafe_allow_html=True)
 
         # ==================== TAB 3: RISK ASSESSMENT ====================
-        with tabs[3]:
+        if selected_view == result_views[3]:
             st.markdown('<div class="glass-card">', unsafe_allow_html=True)
             
             if analysis_mode == "Single Molecule":
@@ -1535,7 +1559,7 @@ if analyze_button or st.session_state.get("loaded_analysis"):
             st.markdown("</div>", unsafe_allow_html=True)
 
         # ==================== TAB 5: COMPETITIVE INTEL ====================
-        with tabs[4]:
+        if selected_view == result_views[4]:
             st.markdown('<div class="glass-card">', unsafe_allow_html=True)
             # Fetch data or use existing all_results
             # We assume master_agent puts competitor data in all_results['competitor'] or similar
@@ -1566,7 +1590,7 @@ if analyze_button or st.session_state.get("loaded_analysis"):
             st.markdown("</div>", unsafe_allow_html=True)
 
         # ==================== TAB 6: PATENT LANDSCAPE ====================
-        with tabs[5]:
+        if selected_view == result_views[5]:
              st.markdown('<div class="glass-card">', unsafe_allow_html=True)
              if analysis_mode == "Single Molecule" and "patent_analysis" in all_results:
                  p_data = all_results["patent_analysis"]
@@ -1590,7 +1614,7 @@ if analyze_button or st.session_state.get("loaded_analysis"):
              st.markdown("</div>", unsafe_allow_html=True)
 
         # ==================== TAB 7: DEEP DIVE ====================
-        with tabs[6]:
+        if selected_view == result_views[6]:
             st.markdown('<div class="glass-card">', unsafe_allow_html=True)
             st.markdown("### 🔍 Deep Dive Analysis")
             
@@ -1620,14 +1644,21 @@ if analyze_button or st.session_state.get("loaded_analysis"):
             else:
                 agent_name = selected_agent.lower().replace(" ", "_")
             
-            # Display chat history
+            # Display chat history as a single markdown block rather than one
+            # chat_message container per message
             chat_container = st.container()
             with chat_container:
-                for msg in st.session_state.chat_history:
-                    with st.chat_message(msg["role"], avatar=msg.get("avatar", None)):
-                        if msg.get('agent'):
-                            st.markdown(f"**{msg.get('agent', '')}**")
-                        st.markdown(msg["content"])
+                if st.session_state.chat_history:
+                    history_md = "\n\n---\n\n".join(
+                        f"**{msg.get('agent') or ('You' if msg['role'] == 'user' else 'Assistant')}**\n\n{msg['content']}"
+                        for msg in st.session_state.chat_history
+                    )
+                    st.markdown(history_md)
+            
+            # Placeholders for the in-progress turn, filled in place so no
+            # rerun of the whole script is needed after a question
+            live_user = st.empty()
+            live_assistant = st.empty()
             
             # Chat input
             if prompt := st.chat_input("Ask a question about the analysis..."):
@@ -1637,9 +1668,10 @@ if analyze_button or st.session_state.get("loaded_analysis"):
                     "content": prompt,
                     "agent": None
                 })
+                live_user.chat_message("user").markdown(prompt)
                 
                 # Get agent response
-                with st.spinner(f"{selected_agent} is thinking..."):
+                with live_assistant.chat_message("assistant", avatar="🤖"), st.spinner(f"{selected_agent} is thinking..."):
                     if hasattr(master_agent, 'query_agent'):
                         response = asyncio.run(
                             master_agent.query_agent(
@@ -1651,22 +1683,21 @@ if analyze_button or st.session_state.get("loaded_analysis"):
                         )
                     else:
                         response = "This feature requires the query_agent method in MasterAgent."
+                live_assistant.chat_message("assistant", avatar="🤖").markdown(response)
                 
-                # Add assistant response to chat
+                # Add assistant response to chat; it joins the history block
+                # on the next natural rerun
                 st.session_state.chat_history.append({
                     "role": "assistant",
                     "content": response,
                     "agent": selected_agent,
                     "avatar": "🤖"
                 })
-                
-                # Rerun to update the chat display
-                st.rerun()
             
             st.markdown('</div>', unsafe_allow_html=True)
 
         # ==================== TAB 8: REPORT DOWNLOAD ====================
-        with tabs[7]:
+        if selected_view == result_views[7]:
             st.markdown('<div class="glass-card">', unsafe_allow_html=True)
             pdf_file = all_results.get("pdf_report")
             if pdf_file:
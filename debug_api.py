@@ -1,6 +1,6 @@
 
 import requests
-import json
+import orjson
 
 def test_api():
     url = "https://clinicaltrials.gov/api/v2/studies"
@@ -15,7 +15,7 @@ def test_api():
         resp = requests.get(url, params=params, timeout=10)
         print(f"Status: {resp.status_code}")
         if resp.status_code == 200:
-            data = resp.json()
+            data = orjson.loads(resp.content)
             print("Keys:", data.keys())
             if 'studies' in data:
                 print(f"Found {len(data['studies'])} studies.")
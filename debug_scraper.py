@@ -21,14 +21,16 @@ def debug_scrape():
         f.write(resp.text)
     
     soup = BeautifulSoup(resp.text, 'html.parser')
-    cards = soup.find_all('div', class_='study-info')
+    # One tree walk for both card layouts, partitioned by class afterwards
+    matches = soup.select('div.study-info, div.results-list-card')
+    cards = [m for m in matches if 'study-info' in m.get('class', [])]
     print(f"Found {len(cards)} cards with class 'study-info'")
     
     # Check for new UI classes if any
     # New CT.gov might use different classes
     
     # Check for 'results-list-card' (common in other scrapers for CT.gov)
-    other_cards = soup.find_all('div', class_='results-list-card')
+    other_cards = [m for m in matches if 'results-list-card' in m.get('class', [])]
     print(f"Found {len(other_cards)} cards with class 'results-list-card'")
 
 if __name__ == "__main__":
@@ -1,13 +1,27 @@
 # master_agent.py
 import asyncio
+import copy
+import hashlib
+import heapq
 import logging
-from datetime import datetime
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timedelta, timezone
 from enum import Enum
-from typing import Any, Dict, List, Optional, Union
-import asyncio
-import logging
+from operator import attrgetter, itemgetter
+from functools import cached_property
+from types import MappingProxyType
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Mapping, Optional, Tuple, Union
 import json
 import os
+import tempfile
+import threading
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Worker agents
 from agents.patent_agent import PatentAgent
@@ -18,11 +32,76 @@ from agents.exim_agent import EXIMAgent
 from agents.internal_knowledge_agent import InternalKnowledgeAgent
 from agents.competitor_agent import CompetitorAgent
 from agents.report_generator_agent import ReportGeneratorAgent
+from agents.base_agent import normalize_findings
 from conversation_manager import ConversationManager
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
+def _create_eager_task(coro) -> asyncio.Task:
+    """
+    Schedule an agent coroutine as a task that starts eagerly (Python 3.12+),
+    so coroutines that never block, such as mocks and cache hits, finish
+    without an extra event-loop round trip. Only the task created here is
+    eager; the running loop's task factory is left alone. Falls back to
+    asyncio.create_task on older Pythons.
+    """
+    eager_task_factory = getattr(asyncio, "eager_task_factory", None)
+    if eager_task_factory is None:
+        return asyncio.create_task(coro)
+    return eager_task_factory(asyncio.get_running_loop(), coro)
+
+class _LazyAgents(Mapping):
+    """
+    Read-only mapping of agent name -> agent that constructs each agent on
+    first lookup. Iterating names (len, keys, `in`) never constructs agents.
+    """
+
+    def __init__(self, factories: Dict[str, Callable[[], Any]]):
+        self._factories = factories
+        self._instances: Dict[str, Any] = {}
+
+    def __getitem__(self, name: str) -> Any:
+        agent = self._instances.get(name)
+        if agent is None:
+            agent = self._factories[name]()
+            self._instances[name] = agent
+        return agent
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._factories)
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+def _json_default(obj: Any) -> Any:
+    """json.dumps fallback: arrays in full (str() would elide long ones), else str()."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return str(obj)
+
+def _utc_timestamp() -> str:
+    """Current UTC time as an ISO-8601 string with a trailing 'Z'."""
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+def _json_round_trips(data: Any) -> bool:
+    """Whether data comes back from JSON encoding and decoding unchanged."""
+    try:
+        return json.loads(json.dumps(data)) == data
+    except (TypeError, ValueError):
+        return False
+
+class _KeyLock:
+    """An asyncio.Lock plus the number of callers holding or waiting on it."""
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+# One row of synthesis["agent_confidences"]: display name, confidence (0-100), weight
+AgentConfidence = namedtuple("AgentConfidence", "agent confidence weight")
+
 class AnalysisStrategy(Enum):
     STANDARD = "standard"
     OPTIMISTIC = "optimistic"
@@ -33,9 +112,87 @@ class MasterAgent:
     Orchestrates all analysis agents in parallel using asyncio.
     """
 
-    def __init__(self):
-        if os.environ.get("MOCK_AGENTS") == "1":
-            from unittest.mock import AsyncMock
+    # Maximum number of memoized synthesis results kept per instance
+    SYNTHESIS_CACHE_SIZE = 128
+    # Result keys that synthesis never reads and that change on every run
+    _SYNTHESIS_IGNORED_KEYS = frozenset({"timestamp", "synthesis", "pdf_report", "analysis_strategy"})
+
+    # How long a successful agent result is reused for the same molecule/disease
+    AGENT_CACHE_TTL = timedelta(hours=1)
+    # Maximum number of agent results kept per instance (and in the cache file)
+    AGENT_CACHE_SIZE = 256
+
+    _BASE_WEIGHTS = {
+        "patent_analysis": 0.25,
+        "clinical_analysis": 0.20,
+        "market_analysis": 0.20,
+        "web_analysis": 0.15,
+        "exim_analysis": 0.10,
+        "internal_analysis": 0.10,
+    }
+    # Read-only agent weights per strategy, built once at class creation
+    _WEIGHTS = {
+        AnalysisStrategy.STANDARD: MappingProxyType(dict(_BASE_WEIGHTS)),
+        # Increase weight for positive indicators
+        AnalysisStrategy.OPTIMISTIC: MappingProxyType({
+            **_BASE_WEIGHTS,
+            "clinical_analysis": 0.25,  # Higher weight for clinical data
+            "market_analysis": 0.25,    # Higher weight for market potential
+            "web_analysis": 0.20,       # Higher weight for web intelligence
+        }),
+        # Increase weight for risk indicators
+        AnalysisStrategy.CONSERVATIVE: MappingProxyType({
+            **_BASE_WEIGHTS,
+            "patent_analysis": 0.30,    # Higher weight for patent risks
+            "market_analysis": 0.15,    # Lower weight for market potential
+            "internal_analysis": 0.15,  # Higher weight for internal knowledge
+        }),
+    }
+
+    # Prebuilt evidence badge HTML per tier; the score is filled in with format()
+    _BADGE_TEMPLATE = """
+        <span class="badge bg-{color}" style="font-size: 0.8em; padding: 0.25em 0.6em; border-radius: 0.25rem;">
+            {label}: {{}}/100
+        </span>
+        """
+    _BADGES = {
+        "success": _BADGE_TEMPLATE.format(color="success", label="Strong Evidence"),
+        "warning": _BADGE_TEMPLATE.format(color="warning", label="Moderate Evidence"),
+        "danger": _BADGE_TEMPLATE.format(color="danger", label="Weak Evidence"),
+    }
+
+    # Per-agent timeout in seconds; agents not listed use DEFAULT_AGENT_TIMEOUT
+    DEFAULT_AGENT_TIMEOUT = 30
+    AGENT_TIMEOUTS = {
+        "patent_analysis": 60,
+        "clinical_analysis": 60,
+        "web_analysis": 45,
+        "market_analysis": 45,
+        "competitor_agent": 45,
+    }
+
+    _AGENT_FACTORIES = {
+        "patent_analysis": PatentAgent,
+        "clinical_analysis": ClinicalTrialsAgent,
+        "market_analysis": MarketAgent,
+        "web_analysis": WebIntelligenceAgent,
+        "exim_analysis": EXIMAgent,
+        "internal_analysis": InternalKnowledgeAgent,
+        "competitor_agent": CompetitorAgent,
+    }
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        """
+        Args:
+            cache_dir: If given, agent results are also persisted to a JSON
+                file in this directory so other processes can reuse them.
+                Ignored when agents are mocked.
+        """
+        mock_mode = os.environ.get("MOCK_AGENTS") == "1"
+        self._is_mock = mock_mode
+        self._mock_result = None
+        if mock_mode:
+            from unittest.mock import AsyncMock, MagicMock
             logger.info("TEST MODE: Using mocked agents.")
             self.agents = {
                 "patent_analysis": AsyncMock(),
@@ -57,23 +214,28 @@ class MasterAgent:
             }
             for agent in self.agents.values():
                 agent.analyze_async.return_value = mock_result
+            self._mock_result = mock_result
             
-            # Mock report generator specifically
-            self.report_generator = AsyncMock()
+            # Mock report generator specifically (generate_report is sync)
+            self.report_generator = MagicMock()
             self.report_generator.generate_report.return_value = "mock_report.pdf"
         else:
-            self.agents = {
-                "patent_analysis": PatentAgent(),
-                "clinical_analysis": ClinicalTrialsAgent(),
-                "market_analysis": MarketAgent(),
-                "web_analysis": WebIntelligenceAgent(),
-                "exim_analysis": EXIMAgent(),
-                "internal_analysis": InternalKnowledgeAgent(),
-                "competitor_agent": CompetitorAgent(),
-            }
-            self.report_generator = ReportGeneratorAgent()
+            # Agents (and the report generator) are built on first use
+            self.agents = _LazyAgents(self._AGENT_FACTORIES)
         self.progress = {name: "Pending" for name in self.agents}
         self.conversation_manager = ConversationManager()
+        self._synthesis_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        # Synthesis runs in worker threads, so cache access is serialized
+        self._synthesis_cache_lock = threading.Lock()
+
+        # Per-agent result cache keyed by agent + call arguments, with one
+        # lock per key so overlapping parallel runs don't duplicate work
+        self._agent_locks: Dict[str, _KeyLock] = {}
+        self._agent_cache_file = None
+        if cache_dir and not mock_mode:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._agent_cache_file = os.path.join(cache_dir, "agent_results_cache.json")
+        self._load_agent_cache()
         
         # Map agent names to their display names
         self.agent_display_names = {
@@ -91,17 +253,145 @@ class MasterAgent:
         """Returns current status of each agent."""
         return self.progress
 
+    @cached_property
+    def report_generator(self) -> ReportGeneratorAgent:
+        return ReportGeneratorAgent()
+
+    def _load_agent_cache(self):
+        """Load persisted agent results, if a cache file is configured, dropping expired ones."""
+        self._agent_cache: Dict[str, Dict[str, Any]] = {}
+        # Set when the cache has changes not yet written to the cache file
+        self._agent_cache_dirty = False
+        if self._agent_cache_file and os.path.exists(self._agent_cache_file):
+            try:
+                with open(self._agent_cache_file, 'r', encoding='utf-8') as f:
+                    self._agent_cache = json.load(f)
+            except json.JSONDecodeError:
+                self._agent_cache = {}
+            self._prune_agent_cache()
+
+    def _prune_agent_cache(self):
+        """
+        Drop cache entries older than AGENT_CACHE_TTL, then the oldest ones
+        beyond AGENT_CACHE_SIZE. Entries are kept in insertion order, which
+        is also their timestamp order.
+        """
+        now = datetime.now(timezone.utc)
+        fresh = [
+            (key, entry) for key, entry in self._agent_cache.items()
+            if self._is_fresh(entry, now)
+        ]
+        self._agent_cache = dict(fresh[-self.AGENT_CACHE_SIZE:])
+
+    def _is_fresh(self, entry: Dict[str, Any], now: datetime) -> bool:
+        """Whether a cache entry is younger than AGENT_CACHE_TTL."""
+        try:
+            timestamp = datetime.fromisoformat(entry['timestamp'].replace("Z", "+00:00"))
+        except (KeyError, TypeError, ValueError):
+            return False
+        # Entries written before timestamps were UTC have no offset; treat
+        # them as expired rather than guess their timezone
+        if timestamp.tzinfo is None:
+            return False
+        return now - timestamp < self.AGENT_CACHE_TTL
+
+    def _save_agent_cache(self):
+        """
+        Persist agent results, if a cache file is configured. The file is
+        written to a temporary name and swapped in, so a crash mid-write
+        leaves the previous cache intact.
+        """
+        if not self._agent_cache_file:
+            return
+        self._prune_agent_cache()
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(
+                dir=os.path.dirname(self._agent_cache_file) or ".", suffix=".tmp"
+            )
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._agent_cache, f)
+            os.replace(tmp_path, self._agent_cache_file)
+            self._agent_cache_dirty = False
+        except Exception as e:
+            logger.error(f"Failed to save agent cache: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _flush_agent_cache(self):
+        """Write the cache file if results were added since it was last saved."""
+        if self._agent_cache_dirty:
+            self._save_agent_cache()
+
+    def _get_cached_agent_result(self, key: str) -> Optional[Any]:
+        """Get an agent result from cache if it is younger than AGENT_CACHE_TTL."""
+        entry = self._agent_cache.get(key)
+        if entry is not None and self._is_fresh(entry, datetime.now(timezone.utc)):
+            return entry['data']
+        return None
+
+    def _set_cached_agent_result(self, key: str, data: Any):
+        """
+        Save an agent result to cache. With a cache file, results that don't
+        survive a JSON round trip unchanged (numpy arrays, tuples, non-string
+        keys, ...) are not cached, so a hit always matches a fresh run. The
+        file itself is written once per analysis by _flush_agent_cache.
+        """
+        if self._agent_cache_file and not _json_round_trips(data):
+            logger.info(f"Not caching {key.split('|', 1)[0]} result: not JSON-serializable as-is.")
+            return
+        # Re-inserting moves the key to the end, keeping timestamp order
+        self._agent_cache.pop(key, None)
+        self._agent_cache[key] = {
+            'timestamp': _utc_timestamp(),
+            'data': copy.deepcopy(data)
+        }
+        self._prune_agent_cache()
+        self._agent_cache_dirty = bool(self._agent_cache_file)
+
     async def _run_agent_async(self, name: str, agent, *args, **kwargs) -> any:
+        """
+        Run a single agent, reusing a cached result for the same arguments
+        when one is still fresh. Failed runs are never cached.
+        """
+        key = "|".join([name, *map(str, args), *(f"{k}={v}" for k, v in sorted(kwargs.items()))])
+        # The lock is dropped once no caller holds or waits on it; counting
+        # users (rather than checking locked()) keeps a waiter that was just
+        # woken from losing its lock to a newcomer
+        key_lock = self._agent_locks.get(key)
+        if key_lock is None:
+            key_lock = self._agent_locks[key] = _KeyLock()
+        key_lock.users += 1
+        try:
+            async with key_lock.lock:
+                cached = self._get_cached_agent_result(key)
+                if cached is not None:
+                    self.progress[name] = "Complete"
+                    logger.info(f"{name} served from cache.")
+                    # Callers may mutate the result; keep the cached copy intact
+                    return copy.deepcopy(cached)
+
+                result = await self._invoke_agent_async(name, agent, *args, **kwargs)
+                if isinstance(result, dict) and "error" not in result:
+                    self._set_cached_agent_result(key, result)
+                return result
+        finally:
+            key_lock.users -= 1
+            if key_lock.users == 0:
+                del self._agent_locks[key]
+
+    async def _invoke_agent_async(self, name: str, agent, *args, **kwargs) -> any:
         """Run a single agent asynchronously with timeout and error handling."""
         self.progress[name] = "Running"
+        timeout = self.AGENT_TIMEOUTS.get(name, self.DEFAULT_AGENT_TIMEOUT)
         try:
-            result = await agent.analyze_async(*args, **kwargs)
+            result = await asyncio.wait_for(agent.analyze_async(*args, **kwargs), timeout=timeout)
             self.progress[name] = "Complete"
             logger.info(f"{name} completed successfully.")
             return result
         except asyncio.TimeoutError:
             self.progress[name] = "Failed"
-            logger.error(f"{name} timed out after 30 seconds.")
+            logger.error(f"{name} timed out after {timeout} seconds.")
             return {"error": "Timeout", "confidence": 0.0}
         except Exception as e:
             self.progress[name] = "Failed"
@@ -110,48 +400,86 @@ class MasterAgent:
 
     def analyze_repurposing(self, molecule_name: str, disease_name: str) -> Dict[str, Any]:
         """
-        Synchronous version that works in both sync and async contexts.
+        Synchronous version for scripts and other code without an event loop.
+
+        Raises:
+            RuntimeError: If called while an event loop is running; await
+                analyze_repurposing_async from async code instead.
         """
         try:
-            # Try to get the running loop
-            loop = asyncio.get_running_loop()
-            # If we get here, we're in an async context
-            return loop.run_until_complete(
-                self.analyze_repurposing_async(molecule_name, disease_name)
-            )
+            asyncio.get_running_loop()
         except RuntimeError:
             # No running event loop, create a new one
             return asyncio.run(self.analyze_repurposing_async(molecule_name, disease_name))
-            
-    async def analyze_repurposing_async(self, molecule_name: str, disease_name: str) -> Dict[str, Any]:
+        raise RuntimeError(
+            "analyze_repurposing cannot be called from a running event loop; "
+            "await analyze_repurposing_async instead"
+        )
+
+    async def iter_agent_results(self, molecule_name: str, disease_name: str) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Runs all agents in parallel and yields (agent_name, result) pairs as
+        each one finishes, so callers can surface partial results without
+        waiting for the slowest agent.
+        """
+        async def run_named(name: str) -> Tuple[str, Any]:
+            # Agents are built lazily, so a failing constructor is reported
+            # as that agent's result instead of aborting the whole run
+            try:
+                agent = self.agents[name]
+            except Exception as e:
+                logger.error(f"{name} could not be initialized: {e}")
+                self.progress[name] = "Failed"
+                return name, {"error": str(e), "confidence": 0.0}
+            return name, await self._run_agent_async(name, agent, molecule_name, disease_name)
+
+        tasks = [_create_eager_task(run_named(name)) for name in self.agents]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Don't leave agents running if the consumer stops early
+            for task in tasks:
+                task.cancel()
+
+    async def analyze_repurposing_async(self, molecule_name: str, disease_name: str,
+                                        synthesize: bool = True, save_cache: bool = True) -> Dict[str, Any]:
         """
         Async version - runs all agents in parallel.
+
+        Pass synthesize=False to leave out the "synthesis" entry, e.g. when
+        the caller synthesizes several analyses as a batch. Likewise pass
+        save_cache=False to leave writing the agent cache file to the caller.
         """
         logger.info(f"Starting parallel analysis for {molecule_name} / {disease_name}.")
         
-        # Run all agents in parallel
-        tasks = [
-            self._run_agent_async(name, agent, molecule_name, disease_name)
-            for name, agent in self.agents.items()
-        ]
-        
-        # Await all tasks with error handling
-        results_list = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Build results dict with error handling
-        all_results = {}
-        for name, result in zip(self.agents.keys(), results_list):
-            if isinstance(result, Exception):
-                all_results[name] = {"error": str(result), "confidence": 0.0}
-            else:
-                all_results[name] = result
+        if self._is_mock:
+            # Mocked agents all return the same constant; skip scheduling them
+            all_results = {name: self._mock_result for name in self.agents}
+            self.progress.update(dict.fromkeys(self.agents, "Complete"))
+        else:
+            # Collect results as agents finish; _run_agent_async already turns
+            # agent exceptions into error results
+            completed = {}
+            async for name, result in self.iter_agent_results(molecule_name, disease_name):
+                completed[name] = result
+
+            # Keep agent order stable regardless of completion order
+            all_results = {name: completed[name] for name in self.agents}
+            if save_cache:
+                self._flush_agent_cache()
                 
         all_results["molecule"] = molecule_name
         all_results["disease"] = disease_name
-        all_results["timestamp"] = datetime.utcnow().isoformat() + "Z"
-
-        # Synthesize results (NOT async - regular call)
-        all_results["synthesis"] = self.synthesize_results(all_results)
+        timestamp = _utc_timestamp()
+        all_results["timestamp"] = timestamp
+
+        # Synthesize results in a worker thread so concurrent analyses
+        # keep the event loop responsive
+        if synthesize:
+            all_results["synthesis"] = await asyncio.to_thread(
+                self.synthesize_results, all_results, timestamp=timestamp
+            )
 
         # Generate PDF report
         pdf_path = await asyncio.to_thread(
@@ -169,20 +497,32 @@ class MasterAgent:
         """
         Compare multiple molecules for a given disease.
         Runs analysis for each molecule in parallel and returns combined results.
+        Repeated molecule names are analyzed once.
         """
+        # Drop duplicates while keeping the caller's order
+        molecules = list(dict.fromkeys(molecules))
         if len(molecules) < 2:
             raise ValueError("At least 2 molecules are required for comparison")
             
         logger.info(f"Starting comparison of {len(molecules)} molecules for {disease_name}")
-        
         # Run analysis for each molecule in parallel
         tasks = [
-            self.analyze_repurposing_async(mol, disease_name)
+            _create_eager_task(self.analyze_repurposing_async(mol, disease_name, synthesize=False, save_cache=False))
             for mol in molecules
         ]
         
-        # Gather all results
+        # Gather all results, then write the agent cache once for all of them
         results_list = await asyncio.gather(*tasks, return_exceptions=True)
+        self._flush_agent_cache()
+
+        # Synthesize the successful analyses as one batch on the thread pool
+        analyzed = [result for result in results_list if not isinstance(result, Exception)]
+        syntheses = await asyncio.gather(*(
+            asyncio.to_thread(self.synthesize_results, result, timestamp=result["timestamp"])
+            for result in analyzed
+        ))
+        for result, synthesis in zip(analyzed, syntheses):
+            result["synthesis"] = synthesis
         
         # Process results
         comparison_results = {}
@@ -197,77 +537,115 @@ class MasterAgent:
                 comparison_results[mol] = result
         
         # Add comparison metadata
+        timestamp = _utc_timestamp()
         comparison_results["comparison_metadata"] = {
             "disease": disease_name,
             "molecules": molecules,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
+            "timestamp": timestamp
         }
         
         # Generate comparison synthesis
         comparison_results["comparison_synthesis"] = await asyncio.to_thread(
-            self.synthesize_comparison, comparison_results
+            self.synthesize_comparison, comparison_results, timestamp
         )
         
         # Store the comparison results in the conversation context
-        for mol, result in comparison_results.items():
-            if isinstance(result, dict) and 'synthesis' in result:
-                for agent_name, agent_result in result.items():
-                    if agent_name in self.agents:
-                        context_key = f"{mol}_{agent_name}"
-                        self.conversation_manager.agent_contexts[context_key] = agent_result
-                        
+        agent_contexts = self.conversation_manager.agent_contexts
+        for mol in molecules:
+            result = comparison_results.get(mol)
+            if not isinstance(result, dict) or 'synthesis' not in result:
+                continue
+            for agent_name in self.agents:
+                if agent_name in result:
+                    agent_contexts[f"{mol}_{agent_name}"] = result[agent_name]
+
         return comparison_results
         
-    def synthesize_results(self, all_agent_results: Dict[str, Any], strategy: AnalysisStrategy = AnalysisStrategy.STANDARD) -> Dict[str, Any]:
+    def synthesize_results(self, all_agent_results: Dict[str, Any], strategy: AnalysisStrategy = AnalysisStrategy.STANDARD,
+                           timestamp: Optional[str] = None) -> Dict[str, Any]:
         """
         Synthesizes results from all agents for a single molecule.
 
         - Handles comparison results (comparison_metadata).
         - Computes weighted overall_confidence from agent-level confidences.
         - Optionally uses per-finding evidence_strength / is_positive from agents.
+
+        Results are memoized per (agent results, strategy), so sweeping
+        strategies over the same analysis only pays for the findings pass once.
+        Pass the caller's timestamp to stamp the synthesis with it; otherwise
+        the current UTC time is used.
         """
         # 1. Comparison mode shortcut
         if "comparison_metadata" in all_agent_results:
-            return self.synthesize_comparison(all_agent_results)
+            return self.synthesize_comparison(all_agent_results, timestamp)
+
+        key = (self._synthesis_cache_key(all_agent_results), strategy.value)
+        with self._synthesis_cache_lock:
+            synthesis = self._synthesis_cache.get(key)
+            if synthesis is not None:
+                self._synthesis_cache.move_to_end(key)
+        if synthesis is None:
+            synthesis = self._compute_synthesis(all_agent_results, strategy)
+            with self._synthesis_cache_lock:
+                self._synthesis_cache[key] = synthesis
+                if len(self._synthesis_cache) > self.SYNTHESIS_CACHE_SIZE:
+                    self._synthesis_cache.popitem(last=False)
+
+        # Deep copy: callers may mutate the lists inside (key_factors,
+        # strengths, ...), which must not leak into later cache hits
+        result = copy.deepcopy(synthesis)
+        result["timestamp"] = timestamp or _utc_timestamp()
+        return result
+
+    def _synthesis_cache_key(self, all_agent_results: Dict[str, Any]) -> str:
+        """Content hash of the parts of a result set that synthesis reads."""
+        payload = {
+            k: v for k, v in all_agent_results.items()
+            if k not in self._SYNTHESIS_IGNORED_KEYS
+        }
+        if orjson is not None:
+            try:
+                serialized = orjson.dumps(
+                    payload,
+                    option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+                    default=str,
+                )
+                return hashlib.blake2b(serialized).hexdigest()
+            except TypeError:
+                # e.g. integers beyond 64 bits; fall back to the stdlib encoder
+                pass
+        serialized = json.dumps(payload, sort_keys=True, default=_json_default)
+        return hashlib.blake2b(serialized.encode("utf-8")).hexdigest()
 
-        # 2. Base agent-level weighting and confidence calculation
+    def _compute_synthesis(self, all_agent_results: Dict[str, Any], strategy: AnalysisStrategy) -> Dict[str, Any]:
+        """Uncached synthesis of a single molecule's agent results (no timestamp)."""
         # 2. Base agent-level weighting and confidence calculation
         weights = self.get_weights(strategy)
 
         # Collect individual agent confidences for uncertainty calculation
-        agent_confidences = []
-        weighted_confidences = []
-        
+        confs = []
+        ws = []
         for agent, weight in weights.items():
             result = all_agent_results.get(agent, {})
             if isinstance(result, dict):
                 try:
-                    conf = float(result.get("confidence", 0.0))
-                    agent_confidences.append(conf)
-                    weighted_confidences.append(conf * weight)
+                    confs.append(float(result.get("confidence", 0.0)))
                 except (TypeError, ValueError):
                     # Default to 0 confidence if invalid
-                    agent_confidences.append(0.0)
-                    weighted_confidences.append(0.0)
-        
+                    confs.append(0.0)
+                ws.append(weight)
+        confs = np.asarray(confs, dtype=np.float64)
+
         # Calculate overall confidence (weighted average)
-        overall_confidence = sum(weighted_confidences)
-        
-        # Calculate standard deviation of agent confidences
-        if len(agent_confidences) > 1:
-            import math
-            mean_confidence = sum(agent_confidences) / len(agent_confidences)
-            variance = sum((x - mean_confidence) ** 2 for x in agent_confidences) / len(agent_confidences)
-            uncertainty = math.sqrt(variance)
-            uncertainty_pct = min(100, max(0, int(uncertainty * 100)))  # Convert to percentage (0-100)
+        overall_confidence = float(np.dot(confs, np.asarray(ws, dtype=np.float64)))
+
+        # Standard deviation of agent confidences, as a percentage (0-100)
+        if confs.size > 1:
+            uncertainty_pct = min(100, max(0, int(confs.std() * 100)))
         else:
             uncertainty_pct = 0  # Default to 0 if not enough data
 
         # 3. Evidence-based weighting from findings (new logic)
-        evidence_total_weight = 0.0
-        evidence_weighted_score = 0.0
-        evidence_findings: List[Dict[str, Any]] = []
-
         strengths: List[str] = []
         weaknesses: List[str] = []
         key_factors: List[str] = []
@@ -307,46 +685,21 @@ class MasterAgent:
             key_factors.append(f"Market opportunity score: {opp}")
 
         # --- New: process agent-level findings if present ---
-        for agent_name, result in all_agent_results.items():
-            if not isinstance(result, dict):
-                continue
-            findings = result.get("findings")
-            if not isinstance(findings, list):
-                continue
-
-            for finding in findings:
-                if not isinstance(finding, dict):
-                    continue
-
-                # Normalize evidence strength 0–100 -> 0–1
-                strength_val = finding.get("evidence_strength", 50)
-                try:
-                    strength_norm = float(strength_val) / 100.0
-                except (TypeError, ValueError):
-                    strength_norm = 0.5  # default
-
-                evidence_weighted_score += strength_norm
-                evidence_total_weight += 1.0
-
-                record = {
-                    "finding": finding,
-                    "weight": strength_norm,
-                    "agent": agent_name,
-                }
-                evidence_findings.append(record)
-
-                # Categorize positive / negative
-                is_positive = finding.get("is_positive", True)
-                text = finding.get("finding") or finding.get("description")
-                if isinstance(text, str):
-                    if is_positive:
-                        strengths.append(text)
-                    else:
-                        weaknesses.append(text)
+        # Flatten every agent's findings once, then score them as an array
+        all_findings = [
+            f for agent_name, result in all_agent_results.items()
+            for f in normalize_findings(result, agent_name)
+        ]
+        for f in all_findings:
+            if f.text is not None:
+                (strengths if f.is_positive else weaknesses).append(f.text)
 
         # Evidence-based score (0–100)
-        if evidence_total_weight > 0:
-            evidence_based_score = int((evidence_weighted_score / evidence_total_weight) * 100)
+        if all_findings:
+            strengths_arr = np.fromiter(
+                (f.strength for f in all_findings), dtype=np.float64, count=len(all_findings)
+            )
+            evidence_based_score = int(strengths_arr.mean() * 100)
         else:
             evidence_based_score = int(overall_confidence * 100)
 
@@ -388,17 +741,14 @@ class MasterAgent:
         summary = " ".join(summary_parts)
 
         # 7. Top 3 key factors from findings by evidence strength
-        if evidence_findings:
-            top_findings = sorted(
-                evidence_findings,
-                key=lambda x: x["weight"],
-                reverse=True,
-            )[:3]
-            # Extend key_factors with these, but avoid duplicates
-            for f in top_findings:
-                text = f["finding"].get("finding") or f["finding"].get("description")
-                if isinstance(text, str) and text not in key_factors:
-                    key_factors.append(text)
+        # (nlargest keeps a 3-entry heap and prefers earlier findings on ties)
+        top_findings = heapq.nlargest(3, all_findings, key=attrgetter("strength"))
+        # Extend key_factors with these, but avoid duplicates
+        seen = set(key_factors)
+        for f in top_findings:
+            if f.text is not None and f.text not in seen:
+                key_factors.append(f.text)
+                seen.add(f.text)
 
         # Format confidence display with uncertainty
         confidence_display = f"{confidence_pct}% ±{uncertainty_pct}%"
@@ -410,13 +760,12 @@ class MasterAgent:
         )
         
         # Prepare agent confidence data for visualization
-        agent_confidence_data = []
-        for agent, conf in zip(weights.keys(), agent_confidences):
-            agent_confidence_data.append({
-                "agent": self.agent_display_names.get(agent, agent),
-                "confidence": int(conf * 100),
-                "weight": weights[agent]
-            })
+        # (tuples; use as_rows() where dicts are needed)
+        display_names = self.agent_display_names
+        agent_confidence_data = [
+            AgentConfidence(display_names.get(agent, agent), int(conf * 100), weight)
+            for (agent, weight), conf in zip(weights.items(), confs.tolist())
+        ]
         
         return {
             "recommendation": recommendation,
@@ -433,7 +782,6 @@ class MasterAgent:
             "weaknesses": weaknesses,
             "risks": risks if risks else ["No significant risks identified"],
             "summary": summary,
-            "timestamp": datetime.utcnow().isoformat() + "Z",
             "needs_review": needs_review,                # Boolean flag for low confidence
         }
         
@@ -441,7 +789,7 @@ class MasterAgent:
         """Get the conversation history for a specific analysis."""
         return self.conversation_manager.get_conversation(molecule, disease)
         
-    def synthesize_comparison(self, comparison_results: Dict[str, Any]) -> Dict[str, Any]:
+    def synthesize_comparison(self, comparison_results: Dict[str, Any], timestamp: Optional[str] = None) -> Dict[str, Any]:
         """
         Synthesize comparison results from multiple molecule analyses.
         """
@@ -458,37 +806,32 @@ class MasterAgent:
         if not molecule_data:
             return {"error": "No valid molecule data to compare"}
             
-        # Generate comparison summary
-        best_mol = max(
-            molecule_data.items(),
-            key=lambda x: x[1].get("score", 0),
-            default=(None, None)
-        )
-        
-        if best_mol[0] is None:
-            return {"error": "Could not determine best candidate"}
-            
-        best_score = best_mol[1].get("score", 0)
-        best_molecules = [
-            mol for mol, data in molecule_data.items()
-            if data.get("score", 0) == best_score
-        ]
-        
-        # Generate comparison points
+        # Build comparison points and track the top score and its ties in one pass
+        best_score = None
+        best_molecules = []
         comparison_points = []
         for mol, data in molecule_data.items():
+            score = data.get("score", 0)
+            if best_score is None or score > best_score:
+                best_score = score
+                best_molecules = [mol]
+            elif score == best_score:
+                best_molecules.append(mol)
             comparison_points.append({
                 "molecule": mol,
-                "score": data.get("score", 0),
+                "score": score,
                 "recommendation": data.get("recommendation", "UNKNOWN"),
                 "confidence": data.get("confidence", 0),
                 "strengths": data.get("strengths", []),
                 "weaknesses": data.get("weaknesses", []),
                 "risks": data.get("risks", [])
             })
+
+        if not best_molecules:
+            return {"error": "Could not determine best candidate"}
         
         # Sort by score (descending)
-        comparison_points.sort(key=lambda x: x["score"], reverse=True)
+        comparison_points.sort(key=itemgetter("score"), reverse=True)
         
         # Generate summary
         if len(best_molecules) == 1:
@@ -507,7 +850,7 @@ class MasterAgent:
             "best_candidates": best_molecules,
             "top_score": best_score,
             "comparison": comparison_points,
-            "timestamp": datetime.utcnow().isoformat() + "Z"
+            "timestamp": timestamp or _utc_timestamp()
         }
     def calculate_evidence_strength(self, sources: List[Dict]) -> int:
         """
@@ -563,59 +906,35 @@ class MasterAgent:
         
         return int(score * 100)
     
+    @staticmethod
+    def as_rows(agent_confidences: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Project synthesis["agent_confidences"] into dicts with agent,
+        confidence and weight keys. Accepts AgentConfidence tuples, plain
+        lists (after a JSON round trip) and dicts from older saved analyses.
+        """
+        return [
+            row if isinstance(row, dict) else dict(zip(AgentConfidence._fields, row))
+            for row in agent_confidences
+        ]
+
     def get_evidence_badge(self, score: int) -> str:
         """Return HTML for a color-coded evidence badge."""
-        if score >= 80:
-            color = "success"
-            label = "Strong Evidence"
-        elif score >= 50:
-            color = "warning"
-            label = "Moderate Evidence"
-        else:
-            color = "danger"
-            label = "Weak Evidence"
-            
-        return f"""
-        <span class="badge bg-{color}" style="font-size: 0.8em; padding: 0.25em 0.6em; border-radius: 0.25rem;">
-            {label}: {score}/100
-        </span>
-        """
+        tier = "success" if score >= 80 else "warning" if score >= 50 else "danger"
+        return self._BADGES[tier].format(score)
 
-    def get_weights(self, strategy: AnalysisStrategy = AnalysisStrategy.STANDARD) -> Dict[str, float]:
-        """Get agent weights based on analysis strategy."""
-        base_weights = {
-            "patent_analysis": 0.25,
-            "clinical_analysis": 0.20,
-            "market_analysis": 0.20,
-            "web_analysis": 0.15,
-            "exim_analysis": 0.10,
-            "internal_analysis": 0.10,
-        }
-        
-        if strategy == AnalysisStrategy.OPTIMISTIC:
-            # Increase weight for positive indicators
-            return {
-                **base_weights,
-                "clinical_analysis": 0.25,  # Higher weight for clinical data
-                "market_analysis": 0.25,    # Higher weight for market potential
-                "web_analysis": 0.20,       # Higher weight for web intelligence
-            }
-        elif strategy == AnalysisStrategy.CONSERVATIVE:
-            # Increase weight for risk indicators
-            return {
-                **base_weights,
-                "patent_analysis": 0.30,    # Higher weight for patent risks
-                "market_analysis": 0.15,    # Lower weight for market potential
-                "internal_analysis": 0.15,  # Higher weight for internal knowledge
-            }
-        return base_weights
+    def get_weights(self, strategy: AnalysisStrategy = AnalysisStrategy.STANDARD) -> Mapping[str, float]:
+        """Get agent weights based on analysis strategy (read-only mapping)."""
+        return self._WEIGHTS[strategy]
 
 
 
     async def analyze_with_strategy(self, molecule_name: str, disease_name: str, strategy: AnalysisStrategy) -> Dict[str, Any]:
         """Run analysis with a specific strategy."""
         results = await self.analyze_repurposing_async(molecule_name, disease_name)
-        synthesis = self.synthesize_results(results, strategy)
+        synthesis = await asyncio.to_thread(
+            self.synthesize_results, results, strategy, timestamp=results["timestamp"]
+        )
         results["synthesis"] = synthesis
         results["analysis_strategy"] = strategy.value
         return results
@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
+import argparse
 import os
+import re
 
 # Define the list of cases
 # Each case: (Drug, Original_Indication, New_Indication, Outcome, Phase_Started, Mechanism_Score_Est)
@@ -84,79 +86,105 @@ cases = [
     ("Bevacizumab", "Cancer", "Gastric Cancer", 0, "Phase3", 5)
 ]
 
-def generate_dataset():
-    data_rows = []
-    
-    # Random seed for reproducibility
-    np.random.seed(42)
+# Typed, columnar copy of the cases built once at import
+CASE_DTYPE = np.dtype([
+    ("drug_name", "U40"),
+    ("original_indication", "U40"),
+    ("new_indication", "U40"),
+    ("outcome", "i1"),
+    ("phase_started", "U10"),
+    ("mech_score", "i1"),
+])
+cases_arr = np.array(cases, dtype=CASE_DTYPE)
 
-    for case in cases:
-        drug, orig, new, outcome, phase, mech_score = case
-        
-        # Feature Engineering (Simulation)
-        
-        # Molecular Similarity (0 - 1)
-        # Successes might have slightly higher similarity or distinct patterns, 
-        # but often repurposing is serendipitous (low similarity to orig mechanism's goal)
-        # We'll map it randomly but loosely correlated with mechanism score
-        base_sim = np.random.uniform(0.3, 0.9)
-        if outcome == 1:
-            # Slight boost for successes to simulate "better fit"
-            molecular_similarity = min(1.0, base_sim + np.random.uniform(-0.1, 0.1))
-        else:
-            molecular_similarity = max(0.0, base_sim + np.random.uniform(-0.15, 0.05))
-            
-        # Disease Category Match (Boolean)
-        # Simple heuristic: look for keyword matches
-        # This is a rough approximation
-        keywords = ["Cancer", "Tumor", "Leukemia", "Lymphoma", "Carcinoma", 
-                    "Diabetes", "Metabolic", "Arthritis", "Pain", "Depression", 
-                    "Infection", "Viral", "Bacterial", "Fungal"]
-        
-        cat_match = False
-        for k in keywords:
-            if (k in orig and k in new):
-                cat_match = True
-                break
-        
-        # Market Size Ratio (New / Old)
-        # Successes often target large new markets (e.g. Viagra, Rogaine)
-        if outcome == 1:
-            market_size_ratio = np.random.lognormal(mean=0.5, sigma=0.8) # Skewed towards > 1
-        else:
-            market_size_ratio = np.random.lognormal(mean=0.0, sigma=0.8)
-            
-        # Mechanism Strength (1-10)
-        # Use the hand-coded score but add slight noise
-        mechanism_strength = max(1, min(10, int(mech_score + np.random.randint(-1, 2))))
+# Keywords for the disease category match heuristic
+keywords = ["Cancer", "Tumor", "Leukemia", "Lymphoma", "Carcinoma", 
+            "Diabetes", "Metabolic", "Arthritis", "Pain", "Depression", 
+            "Infection", "Viral", "Bacterial", "Fungal"]
+# One lowercase alternation so each indication is scanned once for all
+# keywords, regardless of capitalization
+keyword_pattern = re.compile("|".join(re.escape(k.lower()) for k in keywords))
+
+def generate_dataset(legacy_csv=False):
+    # Random generator for reproducibility
+    rng = np.random.default_rng(42)
+
+    n = len(cases_arr)
+    success = cases_arr["outcome"] == 1
+
+    # Feature Engineering (Simulation), one column at a time for all cases
+    
+    # Molecular Similarity (0 - 1)
+    # Successes might have slightly higher similarity or distinct patterns, 
+    # but often repurposing is serendipitous (low similarity to orig mechanism's goal)
+    # We'll map it randomly but loosely correlated with mechanism score
+    base_sim = rng.uniform(0.3, 0.9, n)
+    molecular_similarity = np.where(
+        success,
+        # Slight boost for successes to simulate "better fit"
+        np.minimum(1.0, base_sim + rng.uniform(-0.1, 0.1, n)),
+        np.maximum(0.0, base_sim + rng.uniform(-0.15, 0.05, n)),
+    )
         
-        # Prior Safety Data (Years)
-        # Most repurposing candidates have > 5 years, some > 20
-        prior_safety_data = np.random.choice([5, 8, 10, 15, 20, 25, 30, 40, 50])
+    # Disease Category Match (Boolean)
+    # Simple heuristic: the same keyword appears in both indications
+    # This is a rough approximation
+    orig = pd.Series(cases_arr["original_indication"])
+    new = pd.Series(cases_arr["new_indication"])
+    orig_hits = orig.str.lower().str.findall(keyword_pattern)
+    new_hits = new.str.lower().str.findall(keyword_pattern)
+    cat_match = np.fromiter(
+        (not set(o).isdisjoint(w) for o, w in zip(orig_hits, new_hits)),
+        dtype=bool, count=n,
+    )
+    
+    # Market Size Ratio (New / Old)
+    # Successes often target large new markets (e.g. Viagra, Rogaine)
+    market_size_ratio = np.where(
+        success,
+        rng.lognormal(mean=0.5, sigma=0.8, size=n),  # Skewed towards > 1
+        rng.lognormal(mean=0.0, sigma=0.8, size=n),
+    )
         
-        row = {
-            "drug_name": drug,
-            "original_indication": orig,
-            "new_indication": new,
-            "molecular_similarity": round(molecular_similarity, 3),
-            "phase_started": phase,
-            "disease_category_match": cat_match,
-            "market_size_ratio": round(market_size_ratio, 2),
-            "mechanism_strength": mechanism_strength,
-            "prior_safety_data": prior_safety_data,
-            "outcome": outcome
-        }
-        data_rows.append(row)
-
-    df = pd.DataFrame(data_rows)
+    # Mechanism Strength (1-10)
+    # Use the hand-coded score but add slight noise
+    mechanism_strength = np.clip(cases_arr["mech_score"] + rng.integers(-1, 2, n), 1, 10)
+    
+    # Prior Safety Data (Years)
+    # Most repurposing candidates have > 5 years, some > 20
+    prior_safety_data = rng.choice([5, 8, 10, 15, 20, 25, 30, 40, 50], n)
+    
+    df = pd.DataFrame({
+        "drug_name": cases_arr["drug_name"],
+        "original_indication": orig,
+        "new_indication": new,
+        "molecular_similarity": np.round(molecular_similarity, 3),
+        "phase_started": cases_arr["phase_started"],
+        "disease_category_match": cat_match,
+        "market_size_ratio": np.round(market_size_ratio, 2),
+        "mechanism_strength": mechanism_strength,
+        "prior_safety_data": prior_safety_data,
+        "outcome": cases_arr["outcome"],
+    })
+    # Repeated labels are stored once per category instead of once per row
+    for col in ["drug_name", "original_indication", "new_indication", "phase_started"]:
+        df[col] = df[col].astype("category")
     
-    # Save to CSV
-    output_path = os.path.join("data", "repurposing_training_data.csv")
+    # Save as Parquet (keeps dtypes, much faster to load); CSV on request
     os.makedirs("data", exist_ok=True)
-    df.to_csv(output_path, index=False)
+    if legacy_csv:
+        output_path = os.path.join("data", "repurposing_training_data.csv")
+        df.to_csv(output_path, index=False)
+    else:
+        output_path = os.path.join("data", "repurposing_training_data.parquet")
+        df.to_parquet(output_path, index=False, compression="snappy")
     print(f"Dataset generated with {len(df)} rows at {output_path}")
     print(df.head())
     print(df['outcome'].value_counts())
 
 if __name__ == "__main__":
-    generate_dataset()
+    parser = argparse.ArgumentParser(description="Generate the drug repurposing training dataset.")
+    parser.add_argument("--legacy-csv", action="store_true",
+                        help="write data/repurposing_training_data.csv instead of Parquet")
+    args = parser.parse_args()
+    generate_dataset(legacy_csv=args.legacy_csv)
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+# Preprocessed feature matrix (plus outcome) written by training for verification
+FEATURES_PATH = 'data/repurposing_features.parquet'
+
+# Row labels of the held-out test split, saved by training
+TEST_INDEX_PATH = 'models/test_idx.npy'
+
+# Trained model, stored uncompressed so its arrays can be memory-mapped on load
+MODEL_PATH = 'models/repurposing_predictor.joblib'
+
+# Pickled artifacts written by older training runs (the model, and a
+# standalone scaler from before Logistic Regression carried its own);
+# training removes them
+LEGACY_MODEL_PATH = 'models/repurposing_predictor.pkl'
+LEGACY_SCALER_PATH = 'models/repurposing_scaler.pkl'
+
+# Ordinal order of the phase a repurposing effort started in
+PHASE_ORDER = ['Discovery', 'Phase1', 'Phase2', 'Phase3']
+
+def encode_phase(phase_started):
+    """
+    Encode phase labels as ordinal int8 codes (Discovery=0 ... Phase3=3).
+    Shared by training and verification so both use identical codes;
+    unknown phases become -1.
+    """
+    return pd.Categorical(phase_started, categories=PHASE_ORDER, ordered=True).codes.astype('int8')
+
+def to_xgb_frame(X):
+    """
+    Feature frame for XGBoost models: the phase goes in as a native
+    categorical column (instead of its ordinal code) and the remaining
+    features as float32.
+    """
+    frame = X.drop(columns='phase_started_encoded').astype(np.float32)
+    # Training casts every feature (the phase code included) to float32,
+    # but from_codes only accepts integer codes
+    codes = X['phase_started_encoded'].to_numpy().astype('int8')
+    frame.insert(
+        X.columns.get_loc('phase_started_encoded'),
+        'phase_started',
+        pd.Categorical.from_codes(codes, categories=PHASE_ORDER),
+    )
+    return frame
+
+def predict_batch(model, X):
+    """
+    Predict outcomes for a batch of feature rows.
+
+    `model` is a Pipeline(scaler, linear model), a Random Forest trained on
+    raw features or an XGBoost model trained on to_xgb_frame(X); `X` is the
+    preprocessed feature DataFrame. Binary linear models are scored
+    straight from the scaler statistics and coefficients in float32,
+    skipping sklearn's per-step dispatch and input validation. XGBoost
+    models use inplace_predict to skip building a DMatrix. Anything else
+    falls back to model.predict.
+    """
+    estimator = model
+    scaler = None
+    if hasattr(model, 'named_steps'):
+        scaler = model.named_steps.get('scaler')
+        estimator = model.steps[-1][1]
+
+    if hasattr(estimator, 'get_booster'):
+        if scaler is None:
+            data = to_xgb_frame(X)
+        else:
+            data = np.ascontiguousarray(scaler.transform(X), dtype=np.float32)
+        return (estimator.get_booster().inplace_predict(data) > 0.5).astype(np.int8)
+
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    coef = getattr(estimator, 'coef_', None)
+    if coef is not None and coef.shape[0] == 1:
+        if scaler is not None:
+            X = (X - scaler.mean_.astype(np.float32)) / scaler.scale_.astype(np.float32)
+        logits = X @ coef[0].astype(np.float32) + np.float32(estimator.intercept_[0])
+        return estimator.classes_[(logits > 0).astype(np.int8)]
+
+    if scaler is not None:
+        X = scaler.transform(X)
+    return model.predict(X)
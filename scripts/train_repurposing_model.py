@@ -1,36 +1,52 @@
+import argparse
+import hashlib
+import json
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pickle
+import joblib
 import os
 
 from sklearn.model_selection import train_test_split, cross_val_score
+from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, confusion_matrix, classification_report
 import xgboost as xgb
 
+from repurposing_features import (
+    FEATURES_PATH, LEGACY_MODEL_PATH, LEGACY_SCALER_PATH, MODEL_PATH, TEST_INDEX_PATH,
+    encode_phase, to_xgb_frame,
+)
+
+FEATURE_IMPORTANCE_PATH = 'data/feature_importance.json'
+
+DATA_DTYPES = {
+    'phase_started': 'category',
+    'molecular_similarity': 'float32',
+    'market_size_ratio': 'float32',
+    'mechanism_strength': 'int8',
+    'prior_safety_data': 'int8',
+    'disease_category_match': 'bool',
+    'outcome': 'int8',
+}
+
 def load_and_preprocess_data(filepath):
     print(f"Loading data from {filepath}...")
-    df = pd.read_csv(filepath)
+    # Only the columns training needs are loaded: the phase as a categorical
+    # and numeric columns at the narrowest dtype that fits their range
+    if filepath.endswith('.parquet'):
+        df = pd.read_parquet(filepath, columns=list(DATA_DTYPES)).astype(DATA_DTYPES)
+    else:
+        df = pd.read_csv(filepath, usecols=list(DATA_DTYPES), dtype=DATA_DTYPES)
     
     # Preprocessing
     
     # 1. Encode Phase Started (Ordinal)
-    phase_map = {
-        'Discovery': 0,
-        'Phase1': 1,
-        'Phase2': 2,
-        'Phase3': 3
-    }
-    # Handle potentially unknown phases by filling with median or mode if needed, 
-    # but our dataset is clean.
-    df['phase_started_encoded'] = df['phase_started'].map(phase_map)
+    df['phase_started_encoded'] = encode_phase(df['phase_started'])
     
     # 2. Encode Boolean
-    df['disease_category_match'] = df['disease_category_match'].astype(int)
+    df['disease_category_match'] = df['disease_category_match'].astype('int8')
     
     # 3. Select Features and Target
     feature_cols = [
@@ -43,7 +59,8 @@ def load_and_preprocess_data(filepath):
     ]
     target_col = 'outcome'
     
-    X = df[feature_cols]
+    # float32 features halve the memory moved into the scaler and models
+    X = df[feature_cols].astype(np.float32)
     y = df[target_col]
     
     print(f"Features: {feature_cols}")
@@ -51,20 +68,30 @@ def load_and_preprocess_data(filepath):
     
     return X, y, feature_cols
 
-def train_and_evaluate(X, y, feature_names):
+def train_and_evaluate(X, y, feature_names, plot=False):
     # Split Data
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
     
-    # Scaling
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
+    # Persist the test rows so verification doesn't have to replay the split
+    os.makedirs(os.path.dirname(TEST_INDEX_PATH), exist_ok=True)
+    np.save(TEST_INDEX_PATH, X_test.index.to_numpy())
+    
+    # Only the linear model needs standardized inputs; tree splits are
+    # unaffected by feature scaling, so RF and XGBoost get the raw features.
+    # XGBoost takes the phase as a native categorical instead of its code.
+    raw_inputs = (X_train.to_numpy(dtype=np.float32), X_test.to_numpy(dtype=np.float32))
+    model_inputs = {'XGBoost': (to_xgb_frame(X_train), to_xgb_frame(X_test))}
     
     # Models to train
     models = {
-        'Logistic Regression': LogisticRegression(random_state=42),
-        'Random Forest': RandomForestClassifier(n_estimators=100, random_state=42),
-        'XGBoost': xgb.XGBClassifier(use_label_encoder=False, eval_metric='logloss', random_state=42)
+        'Logistic Regression': Pipeline([
+            ('scaler', StandardScaler()),
+            ('lr', LogisticRegression(random_state=42)),
+        ]),
+        'Random Forest': RandomForestClassifier(n_estimators=100, n_jobs=-1, random_state=42),
+        'XGBoost': xgb.XGBClassifier(
+            tree_method='hist', enable_categorical=True, n_jobs=-1, eval_metric='logloss', random_state=42
+        )
     }
     
     best_model = None
@@ -76,11 +103,13 @@ def train_and_evaluate(X, y, feature_names):
     print("\n--- Model Evaluation ---")
     
     for name, model in models.items():
+        model_X_train, model_X_test = model_inputs.get(name, raw_inputs)
+
         # Train
-        model.fit(X_train_scaled, y_train)
+        model.fit(model_X_train, y_train)
         
         # Predict
-        y_pred = model.predict(X_test_scaled)
+        y_pred = model.predict(model_X_test)
         
         # Metrics
         acc = accuracy_score(y_test, y_pred)
@@ -106,35 +135,79 @@ def train_and_evaluate(X, y, feature_names):
     # Feature Importance (for Tree methods)
     if hasattr(best_model, 'feature_importances_'):
         importances = best_model.feature_importances_
-        indices = np.argsort(importances)[::-1]
-        
-        plt.figure(figsize=(10, 6))
-        plt.title(f"Feature Importances ({best_model_name})")
-        plt.bar(range(X.shape[1]), importances[indices], align="center")
-        plt.xticks(range(X.shape[1]), [feature_names[i] for i in indices], rotation=45)
-        plt.tight_layout()
-        os.makedirs('data', exist_ok=True)
-        plt.savefig('data/feature_importance.png')
-        print("Feature importance plot saved to data/feature_importance.png")
-    
-    return best_model, scaler
+        save_feature_importance(feature_names, importances)
+        if plot:
+            plot_feature_importance(feature_names, importances, best_model_name)
+    
+    return best_model
+
+def save_feature_importance(feature_names, importances):
+    # Plain JSON so the app can read importances without pulling in matplotlib
+    os.makedirs(os.path.dirname(FEATURE_IMPORTANCE_PATH), exist_ok=True)
+    with open(FEATURE_IMPORTANCE_PATH, 'w') as f:
+        json.dump({name: round(float(value), 6) for name, value in zip(feature_names, importances)}, f, indent=2)
+    print(f"Feature importances saved to {FEATURE_IMPORTANCE_PATH}")
+
+def plot_feature_importance(feature_names, importances, model_name):
+    # Plots are keyed by their content, so an unchanged model skips rendering
+    importances = np.asarray(importances, dtype=np.float32)
+    key = hashlib.sha1('\0'.join(feature_names).encode() + importances.tobytes()).hexdigest()[:12]
+    plot_path = f'data/fi_{key}.png'
+    if os.path.exists(plot_path):
+        print(f"Feature importance plot unchanged at {plot_path}")
+        return plot_path
+    
+    # Imported here so training runs without --plot never load matplotlib;
+    # Agg skips GUI backend probing
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    
+    indices = np.argsort(importances)[::-1]
+    
+    fig = plt.figure(figsize=(10, 6))
+    plt.title(f"Feature Importances ({model_name})")
+    plt.bar(range(len(importances)), importances[indices], align="center")
+    plt.xticks(range(len(importances)), [feature_names[i] for i in indices], rotation=45)
+    plt.tight_layout()
+    os.makedirs('data', exist_ok=True)
+    plt.savefig(plot_path)
+    plt.close(fig)
+    print(f"Feature importance plot saved to {plot_path}")
+    return plot_path
+
+def save_features(X, y):
+    # Columnar copy of the preprocessed data so verification skips CSV parsing
+    os.makedirs(os.path.dirname(FEATURES_PATH), exist_ok=True)
+    X.assign(outcome=y).to_parquet(FEATURES_PATH)
+    print(f"Preprocessed features saved to {FEATURES_PATH}")
 
-def save_artifacts(model, scaler):
+def save_artifacts(model):
     os.makedirs('models', exist_ok=True)
     
-    with open('models/repurposing_predictor.pkl', 'wb') as f:
-        pickle.dump(model, f)
-    
-    with open('models/repurposing_scaler.pkl', 'wb') as f:
-        pickle.dump(scaler, f)
+    # The model is self-contained (Logistic Regression carries its scaler in
+    # a Pipeline), so drop pickles left over from older training runs
+    joblib.dump(model, MODEL_PATH)
+    for legacy_path in (LEGACY_MODEL_PATH, LEGACY_SCALER_PATH):
+        if os.path.exists(legacy_path):
+            os.remove(legacy_path)
         
-    print("Model and scaler saved to models/")
+    print(f"Model saved to {MODEL_PATH}")
 
 if __name__ == "__main__":
-    data_path = "data/repurposing_training_data.csv"
+    parser = argparse.ArgumentParser(description="Train the drug repurposing success predictor.")
+    parser.add_argument("--plot", action="store_true",
+                        help="also render the feature importance plot (needs matplotlib)")
+    args = parser.parse_args()
+    
+    # Prefer the Parquet dataset; fall back to a CSV from --legacy-csv
+    data_path = "data/repurposing_training_data.parquet"
+    if not os.path.exists(data_path):
+        data_path = "data/repurposing_training_data.csv"
     if not os.path.exists(data_path):
         print(f"Error: {data_path} not found.")
     else:
         X, y, feature_names = load_and_preprocess_data(data_path)
-        best_model, scaler = train_and_evaluate(X, y, feature_names)
-        save_artifacts(best_model, scaler)
+        save_features(X, y)
+        best_model = train_and_evaluate(X, y, feature_names, plot=args.plot)
+        save_artifacts(best_model)
@@ -1,17 +1,15 @@
+import numpy as np
 import pandas as pd
-import pickle
-import os
+import joblib
 from sklearn.metrics import accuracy_score
-from sklearn.model_selection import train_test_split
+
+from repurposing_features import (
+    FEATURES_PATH, MODEL_PATH, TEST_INDEX_PATH, predict_batch,
+)
 
 def verify():
-    # Load data
-    df = pd.read_csv('data/repurposing_training_data.csv')
-    
-    # Preprocess (same as training)
-    phase_map = {'Discovery': 0, 'Phase1': 1, 'Phase2': 2, 'Phase3': 3}
-    df['phase_started_encoded'] = df['phase_started'].map(phase_map)
-    df['disease_category_match'] = df['disease_category_match'].astype(int)
+    # Load the features preprocessed and saved by training
+    df = pd.read_parquet(FEATURES_PATH)
     
     feature_cols = [
         'molecular_similarity', 
@@ -24,20 +22,16 @@ def verify():
     X = df[feature_cols]
     y = df['outcome']
     
-    # Split (same seed)
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-    
-    # LoadScaler
-    with open('models/repurposing_scaler.pkl', 'rb') as f:
-        scaler = pickle.load(f)
-    X_test_scaled = scaler.transform(X_test)
+    # Test rows saved at training time
+    test_idx = np.load(TEST_INDEX_PATH)
+    X_test = X.loc[test_idx]
+    y_test = y.loc[test_idx]
     
-    # Load Model
-    with open('models/repurposing_predictor.pkl', 'rb') as f:
-        model = pickle.load(f)
+    # Load Model; its arrays are memory-mapped rather than copied into memory
+    model = joblib.load(MODEL_PATH, mmap_mode='r')
         
     # Predict
-    y_pred = model.predict(X_test_scaled)
+    y_pred = predict_batch(model, X_test)
     acc = accuracy_score(y_test, y_pred)
     
     print(f"Validation Accuracy: {acc}")
@@ -0,0 +1,10 @@
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+if uvloop is not None:
+    def pytest_asyncio_loop_factories(config, item):
+        """Run async tests on uvloop's C event loop when it is installed."""
+        return {"uvloop": uvloop.new_event_loop}
@@ -10,11 +10,11 @@ project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
 from agents.clinical_trials_agent import ClinicalTrialsAgent
-import requests
+import httpx
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def sample_html():
-    """Load the sample HTML fixture."""
+    """Load the sample HTML fixture (read once per module)."""
     fixture_path = Path(__file__).parent / "fixtures" / "sample_clinicaltrials_response.html"
     with open(fixture_path, "r", encoding="utf-8") as f:
         return f.read()
@@ -43,7 +43,6 @@ def test_initialization_fallback_missing_key(monkeypatch):
         with pytest.raises(EnvironmentError, match="GEMINI_API_KEY not found"):
             ClinicalTrialsAgent(use_live_data=False)
 
-@pytest.mark.asyncio
 async def test_analyze_async_calls_scrape(agent):
     """Test analyze_async calls scrape_clinical_trials when use_live_data is True."""
     with patch.object(agent, 'scrape_clinical_trials', new_callable=AsyncMock) as mock_scrape:
@@ -52,7 +51,6 @@ async def test_analyze_async_calls_scrape(agent):
         mock_scrape.assert_awaited_once_with("DrugA", "DiseaseB")
         assert result == {"full": "report"}
 
-@pytest.mark.asyncio
 async def test_analyze_async_calls_gemini_fallback(mock_env):
     """Test analyze_async calls analyze_with_gemini when use_live_data is False."""
     agent = ClinicalTrialsAgent(use_live_data=False)
@@ -62,10 +60,9 @@ async def test_analyze_async_calls_gemini_fallback(mock_env):
         mock_gemini.assert_awaited_once_with("DrugA", "DiseaseB")
         assert result == {"fallback": "report"}
 
-@pytest.mark.asyncio
 async def test_scrape_clinical_trials_success(agent, sample_html):
     """Test successful scraping and parsing of trial data."""
-    with patch('requests.get') as mock_get:
+    with patch('httpx.AsyncClient.get', new_callable=AsyncMock) as mock_get:
         mock_response = Mock()
         mock_response.text = sample_html
         mock_response.status_code = 200
@@ -114,10 +111,9 @@ async def test_scrape_clinical_trials_success(agent, sample_html):
         assert data['phases']['phase_2'] == 1
         assert data['phases']['phase_3'] == 1
 
-@pytest.mark.asyncio
 async def test_scrape_clinical_trials_empty(agent):
     """Test scraping when no trials are found."""
-    with patch('requests.get') as mock_get:
+    with patch('httpx.AsyncClient.get', new_callable=AsyncMock) as mock_get:
         mock_response = Mock()
         mock_response.text = "<html><body><div id='no-results'></div></body></html>"
         mock_response.status_code = 200
@@ -129,19 +125,36 @@ async def test_scrape_clinical_trials_empty(agent):
         assert data['active_trials'] == 0
         assert data['trials'] == []
 
-@pytest.mark.asyncio
 async def test_scrape_clinical_trials_network_timeout(agent):
     """Test handling of network timeout."""
-    with patch('requests.get', side_effect=requests.exceptions.Timeout):
+    with patch('httpx.AsyncClient.get', new_callable=AsyncMock, side_effect=httpx.TimeoutException("timed out")):
         with pytest.raises(RuntimeError, match="Failed to fetch clinical trials data"):
             await agent.scrape_clinical_trials("Drug", "Disease")
 
-@pytest.mark.asyncio
+async def test_scrape_clinical_trials_closes_client(agent):
+    """The HTTP client is closed after the request, even when it fails."""
+    clients = []
+    new_client = agent._new_client
+
+    def track_client():
+        clients.append(new_client())
+        return clients[-1]
+
+    with patch.object(agent, '_new_client', side_effect=track_client), \
+         patch('httpx.AsyncClient.get', new_callable=AsyncMock, side_effect=httpx.TimeoutException("timed out")):
+        with pytest.raises(RuntimeError):
+            await agent.scrape_clinical_trials("Drug", "Disease")
+
+    assert len(clients) == 1
+    assert clients[0].is_closed
+
 async def test_scrape_clinical_trials_http_429(agent):
     """Test handling of HTTP 429 Too Many Requests."""
-    with patch('requests.get') as mock_get:
+    with patch('httpx.AsyncClient.get', new_callable=AsyncMock) as mock_get:
         mock_response = Mock()
-        mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError("429 Client Error")
+        mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
+            "429 Client Error", request=Mock(), response=Mock()
+        )
         mock_get.return_value = mock_response
 
         with pytest.raises(RuntimeError, match="Failed to fetch clinical trials data"):
@@ -1,6 +1,6 @@
 
 import pytest
-from pydantic import BaseModel, Field, ValidationError, validator
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
 from typing import List, Optional, Literal
 from datetime import datetime, date
 import re
@@ -9,13 +9,20 @@ import re
 # SCHEMA DEFINITIONS
 # ======================================================================================
 
-class ClinicalTrial(BaseModel):
+_PATENT_RE = re.compile(r'^(US|WO|EP)-?\d+')
+
+class _Schema(BaseModel):
+    """Immutable schema that strips surrounding whitespace from strings."""
+    model_config = ConfigDict(frozen=True, str_strip_whitespace=True)
+
+class ClinicalTrial(_Schema):
     title: str = Field(..., min_length=1)
     phase: Literal["Phase 1", "Phase 2", "Phase 3", "Phase 4", "Not Applicable", "Unknown"]
     status: Literal["Recruiting", "Active, not recruiting", "Completed", "Terminated", "Withdrawn", "Unknown"]
     start_date: Optional[str] = None # Allowing strings for flexibility, but validating format if present
 
-    @validator('start_date')
+    @field_validator('start_date')
+    @classmethod
     def validate_date_format(cls, v):
         if v and v != "N/A":
             # Check for general date format (YYYY-MM-DD or Month YYYY)
@@ -26,23 +33,25 @@ class ClinicalTrial(BaseModel):
             pass 
         return v
 
-class ClinicalAnalysisResult(BaseModel):
+class ClinicalAnalysisResult(_Schema):
     trials: List[ClinicalTrial]
     active_trials_count: int = Field(..., ge=0)
     
-class PatentFinding(BaseModel):
+class PatentFinding(_Schema):
     patent_number: str
     expiration_date: str
     fto_status: bool | str # Allow boolean or "Clear"/"Blocked" string
     
-    @validator('patent_number')
+    @field_validator('patent_number')
+    @classmethod
     def validate_patent_number(cls, v):
         # Allow US format or general WO/EP
-        if not re.match(r'^(US|WO|EP)-?\d+', v):
+        if not _PATENT_RE.match(v):
             raise ValueError(f"Invalid patent number format: {v}")
         return v
         
-    @validator('expiration_date')
+    @field_validator('expiration_date')
+    @classmethod
     def validate_expiration_future(cls, v):
         try:
             exp_date = datetime.strptime(v, "%Y-%m-%d").date()
@@ -56,18 +65,18 @@ class PatentFinding(BaseModel):
             raise ValueError("Date must be YYYY-MM-DD")
         return v
 
-class MarketData(BaseModel):
+class MarketData(_Schema):
     tam: float = Field(..., gt=0)
     sam: float = Field(..., gt=0)
     som: float = Field(..., gt=0)
     cagr: float = Field(..., ge=0, le=100)
     market_share_target: float = Field(..., gt=0, le=100)
 
-class SynthesisResult(BaseModel):
+class SynthesisResult(_Schema):
     recommendation: Literal["PROCEED", "CAUTION", "REJECT", "NOT RECOMMENDED", "REVIEW"] # Expanded based on app.py logic
     confidence: float = Field(..., ge=0, le=100)
-    key_factors: List[str] = Field(..., min_items=3)
-    risks: List[str] = Field(..., min_items=1)
+    key_factors: List[str] = Field(..., min_length=3)
+    risks: List[str] = Field(..., min_length=1)
     
 
 # ======================================================================================
@@ -156,7 +165,7 @@ def test_synthesis_validation_invalid_empty_risks():
         "recommendation": "CAUTION",
         "confidence": 50.0,
         "key_factors": ["F1", "F2", "F3"],
-        "risks": [] # Invalid: min_items=1
+        "risks": [] # Invalid: min_length=1
     }
     with pytest.raises(ValidationError):
         SynthesisResult(**data)
@@ -0,0 +1,204 @@
+import asyncio
+import pytest
+import re
+import subprocess
+import time
+import os
+import sys
+import urllib.error
+import urllib.request
+import shutil
+from pathlib import Path
+
+# Playwright drives the browser over one persistent connection instead of an
+# HTTP round trip per command, and its expect() assertions auto-wait
+pytest.importorskip("playwright.sync_api")
+from playwright.sync_api import Page, expect
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+# Config
+APP_PATH = "app.py"
+# Each pytest-xdist worker (gw0, gw1, ...) runs its own Streamlit server
+PORT = 8501 + int(os.environ.get("PYTEST_XDIST_WORKER", "gw0")[2:])
+BASE_URL = f"http://localhost:{PORT}"
+STARTUP_TIMEOUT = 30
+
+def wait_for_streamlit(process, timeout=STARTUP_TIMEOUT):
+    """Poll Streamlit's health endpoint until the server answers or the process dies."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            pytest.fail(f"Streamlit exited during startup:\n{process.stderr.read().decode(errors='replace')}")
+        try:
+            with urllib.request.urlopen(f"{BASE_URL}/_stcore/health", timeout=0.25) as response:
+                if response.status == 200:
+                    return
+        except (ConnectionError, urllib.error.URLError, TimeoutError):
+            pass
+        time.sleep(0.1)
+    pytest.fail(f"Streamlit did not become healthy within {timeout}s")
+
+@pytest.fixture(scope="session")
+def mock_agents_preflight():
+    """Skip the E2E flows up front if MasterAgent's MOCK_AGENTS path is broken."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("MOCK_AGENTS", "1")
+        try:
+            from master_agent import MasterAgent
+            result = asyncio.run(MasterAgent().analyze_repurposing_async("Metformin", "NASH"))
+        except Exception as e:
+            pytest.skip(f"MOCK_AGENTS analysis is broken: {e!r}")
+    if "synthesis" not in result:
+        pytest.skip("MOCK_AGENTS analysis returned no synthesis")
+
+@pytest.fixture(scope="session")
+def streamlit_app(mock_agents_preflight):
+    """Fixture to run Streamlit app in a subprocess with mocks enabled."""
+    env = os.environ.copy()
+    env["MOCK_AGENTS"] = "1"
+    env["HEADLESS"] = "true"  # Should be used by app if it checks for CI, though not explicitly used in app.py logic
+    
+    # Check if streamlit is in path
+    cmd = ["streamlit", "run", APP_PATH, "--server.port", str(PORT), "--server.headless", "true"]
+    
+    if shutil.which("streamlit") is None:
+        # Fallback to python -m streamlit if executable not found
+        cmd = [sys.executable, "-m", "streamlit", "run", APP_PATH, "--server.port", str(PORT), "--server.headless", "true"]
+
+    process = subprocess.Popen(
+        cmd,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=project_root
+    )
+    
+    # Wait for app to be ready
+    try:
+        wait_for_streamlit(process)
+    except BaseException:
+        process.terminate()
+        process.wait()
+        raise
+    
+    yield process
+
+    # Teardown
+    process.terminate()
+    process.wait()
+
+@pytest.fixture(scope="session")
+def browser_type_launch_args(browser_type_launch_args):
+    """Chromium flags for DOM-only checks: skip GPU, extensions and background fetches."""
+    return {
+        **browser_type_launch_args,
+        "args": [
+            "--disable-gpu",
+            "--disable-extensions",
+            "--disable-background-networking",
+            "--disable-features=Translate,BackForwardCache",
+        ],
+    }
+
+@pytest.fixture(scope="session")
+def browser_context_args(browser_context_args):
+    """Shared settings for the fresh context each test gets from the session's browser."""
+    return {**browser_context_args, "viewport": {"width": 1920, "height": 1080}}
+
+@pytest.fixture
+def app_page(streamlit_app, page: Page) -> Page:
+    """A fresh Streamlit session with its widgets rendered."""
+    # Images don't affect any assertion, so don't fetch them
+    page.route("**/*", lambda route: route.abort() if route.request.resource_type == "image" else route.continue_())
+    page.goto(BASE_URL, wait_until="domcontentloaded")
+    expect(page.get_by_role("textbox").first).to_be_visible(timeout=10000)
+    return page
+
+def test_single_molecule_analysis_flow(app_page: Page):
+    """Test Flow 1: Single Molecule Analysis with Mock Agents."""
+    # 1. Fill inputs: Molecule (0), Disease (1) based on app layout columns
+    app_page.get_by_role("textbox").nth(0).fill("Metformin")
+    app_page.get_by_role("textbox").nth(1).fill("NASH")
+    
+    # 2. Click "Run Comprehensive Analysis"
+    app_page.get_by_role("button", name="Run Comprehensive Analysis").click()
+    
+    # 3. Wait for completion: the Executive Summary tab appears
+    try:
+        expect(app_page.get_by_text("Executive Summary").first).to_be_visible(timeout=20000)
+    except AssertionError:
+        app_page.screenshot(path="completeness_failure.png")
+        raise
+        
+    # Verify Mock Data Result
+    # Looking for "PROCEED" recommendation and the finding text from the mock logic
+    expect(app_page.get_by_text("PROCEED").first).to_be_visible(timeout=5000)
+    expect(app_page.get_by_text("Mocked finding").first).to_be_visible(timeout=5000)
+
+def test_compare_molecules_flow(app_page: Page):
+    """Test Flow 2: Compare Molecules."""
+    # Switch to "Compare Molecules"
+    app_page.get_by_text("Compare Molecules", exact=True).first.click()
+    
+    # Should see different inputs now
+    expect(app_page.get_by_text("Enter 2-3 molecules to compare")).to_be_visible(timeout=15000)
+
+    # Note: Implementing full interaction with dynamic inputs for Streamlit can be flaky
+    # without exact unique IDs. We verified the mode switch at least.
+
+@pytest.fixture
+def saved_analyses_cleanup():
+    """Remove the analyses a test saves so they don't pile up in the project."""
+    saved_dir = project_root / "saved_analyses"
+    before = set(saved_dir.glob("*.json"))
+    yield
+    for path in set(saved_dir.glob("*.json")) - before:
+        path.unlink(missing_ok=True)
+
+def test_save_load_analysis(app_page: Page, saved_analyses_cleanup):
+    """Test Flow 3: Save/Load Persistance."""
+    # Run a quick new analysis to save
+    app_page.get_by_role("textbox").nth(0).fill("Aspirin")
+    app_page.get_by_role("textbox").nth(1).fill("Pain")
+    app_page.get_by_role("button", name="Run Comprehensive Analysis").click()
+    
+    # Wait for mock analysis
+    expect(app_page.get_by_text("Executive Summary").first).to_be_visible(timeout=20000)
+    
+    # Save it and pick it from the sidebar's saved analyses
+    app_page.get_by_role("button", name="Save Analysis").click()
+    sidebar = app_page.get_by_test_id("stSidebar")
+    sidebar.get_by_test_id("stSelectbox").click()
+    app_page.get_by_role("option", name=re.compile(r"^Aspirin - Pain")).first.click()
+    
+    expect(sidebar.get_by_text("Loaded analysis for Aspirin - Pain")).to_be_visible(timeout=10000)
+
+def test_deep_dive_qa(app_page: Page):
+    """Test Flow 4: Deep Dive Q&A."""
+    app_page.get_by_role("textbox").nth(0).fill("Metformin")
+    app_page.get_by_role("textbox").nth(1).fill("NASH")
+    app_page.get_by_role("button", name="Run Comprehensive Analysis").click()
+    expect(app_page.get_by_text("Executive Summary").first).to_be_visible(timeout=20000)
+    
+    # Open the Deep Dive view and ask a question
+    app_page.get_by_text("💬 Deep Dive", exact=True).click()
+    expect(app_page.get_by_text("Deep Dive Analysis")).to_be_visible(timeout=10000)
+    chat_input = app_page.get_by_placeholder("Ask a question about the analysis...")
+    chat_input.fill("What are the main patent risks?")
+    chat_input.press("Enter")
+    
+    # The in-progress turn is the only pair of chat messages on the page
+    messages = app_page.get_by_test_id("stChatMessage")
+    expect(messages.first).to_contain_text("What are the main patent risks?", timeout=10000)
+    expect(messages).to_have_count(2, timeout=20000)
+    
+    # A follow-up moves the first turn into the single history block, so
+    # the page still holds only the live pair of chat messages
+    chat_input.fill("Which trials are still recruiting?")
+    chat_input.press("Enter")
+    expect(messages.first).to_contain_text("Which trials are still recruiting?", timeout=10000)
+    expect(messages).to_have_count(2, timeout=20000)
+    expect(app_page.get_by_text("What are the main patent risks?")).to_have_count(1)
@@ -1,15 +1,20 @@
 
 import pytest
 import asyncio
+import copy
 import sys
+import threading
 from unittest.mock import AsyncMock, MagicMock, patch
 from pathlib import Path
 
+import numpy as np
+
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.append(str(project_root))
 
-from master_agent import MasterAgent, AnalysisStrategy
+from agents.base_agent import BaseAgent
+from master_agent import MasterAgent, AnalysisStrategy, _create_eager_task
 
 @pytest.fixture
 def mock_agent_result():
@@ -24,19 +29,19 @@ def mock_agent_result():
         "opportunity_score": 75 # for market
     }
 
-@pytest.fixture
-def master_agent(mock_agent_result):
+@pytest.fixture(scope="function")
+def master_agent(mock_agent_result, monkeypatch):
     """Create master agent with mocked workers."""
+    # A fresh instance per test so no cache or progress state leaks between
+    # tests; agents are built lazily, so construction is cheap
+    monkeypatch.delenv("MOCK_AGENTS", raising=False)
     agent = MasterAgent()
     
     # Mock all sub-agents
-    mock_agents = {}
-    for name in agent.agents:
-        mock_sub = AsyncMock()
-        mock_sub.analyze_async.return_value = mock_agent_result.copy()
-        mock_agents[name] = mock_sub
-        
-    agent.agents = mock_agents
+    agent.agents = {
+        name: AsyncMock(analyze_async=AsyncMock(return_value=mock_agent_result.copy()))
+        for name in MasterAgent._AGENT_FACTORIES
+    }
     
     # Mock report generator (sync method running in thread)
     agent.report_generator = MagicMock()
@@ -44,7 +49,6 @@ def master_agent(mock_agent_result):
     
     return agent
 
-@pytest.mark.asyncio
 async def test_analyze_repurposing_async_success(master_agent):
     """Scenario 1: All 6 agents complete successfully."""
     # Run analysis
@@ -65,7 +69,6 @@ async def test_analyze_repurposing_async_success(master_agent):
     for name, mock in master_agent.agents.items():
         mock.analyze_async.assert_awaited_once_with("DrugA", "DiseaseB")
 
-@pytest.mark.asyncio
 async def test_analyze_repurposing_async_partial_failure(master_agent):
     """Scenario 2: One agent fails, others continue (graceful degradation)."""
     # Make patent agent fail
@@ -83,7 +86,6 @@ async def test_analyze_repurposing_async_partial_failure(master_agent):
     # Synthesis should still work (might have lower confidence/score)
     assert "synthesis" in result
 
-@pytest.mark.asyncio
 async def test_analyze_repurposing_async_timeout(master_agent):
     """Scenario 4: Timeout handling for slow agents."""
     # Simulate timeout by raising asyncio.TimeoutError
@@ -98,7 +100,144 @@ async def test_analyze_repurposing_async_timeout(master_agent):
     assert master_agent.progress["market_analysis"] == "Failed"
     assert master_agent.progress["clinical_analysis"] == "Complete"
 
-@pytest.mark.asyncio
+async def test_hung_agent_hits_its_timeout(master_agent, mock_agent_result):
+    """An agent that never returns is cut off after its configured timeout."""
+    async def hang(*args, **kwargs):
+        await asyncio.sleep(10)
+        return mock_agent_result.copy()
+
+    master_agent.agents["web_analysis"].analyze_async.side_effect = hang
+
+    with patch.dict(MasterAgent.AGENT_TIMEOUTS, {"web_analysis": 0.01}):
+        result = await master_agent.analyze_repurposing_async("DrugA", "DiseaseB")
+
+    assert result["web_analysis"]["error"] == "Timeout"
+    assert master_agent.progress["web_analysis"] == "Failed"
+
+async def test_base_agent_uses_configured_timeout(master_agent, mock_agent_result):
+    """Agents on the default BaseAgent.analyze_async are bounded only by AGENT_TIMEOUTS."""
+    release = threading.Event()
+
+    class BlockingAgent(BaseAgent):
+        def analyze(self, molecule_name, disease_name=None):
+            release.wait(5)
+            return mock_agent_result.copy()
+
+    master_agent.agents["web_analysis"] = BlockingAgent()
+    try:
+        with patch.dict(MasterAgent.AGENT_TIMEOUTS, {"web_analysis": 0.05}):
+            result = await master_agent.analyze_repurposing_async("DrugA", "DiseaseB")
+    finally:
+        release.set()
+
+    assert result["web_analysis"]["error"] == "Timeout"
+    # Keyword arguments reach analyze() in the worker thread
+    assert await BlockingAgent().analyze_async("DrugA", disease_name="DiseaseB") == mock_agent_result
+
+async def test_agent_cache_persists_json_safe_results(tmp_path, mock_agent_result):
+    """Persisted agent results survive a reload; expired and non-JSON ones don't."""
+    master = MasterAgent(cache_dir=str(tmp_path))
+    master._set_cached_agent_result("market_analysis|DrugA|DiseaseB", mock_agent_result)
+    master._set_cached_agent_result("patent_analysis|DrugA|DiseaseB", {"findings_soa": (np.zeros(2), np.ones(2))})
+    master._agent_cache["web_analysis|DrugA|DiseaseB"] = {"timestamp": "2000-01-01T00:00:00Z", "data": {}}
+    master._save_agent_cache()
+
+    # Nothing but the cache file is left behind in the directory
+    assert [p.name for p in tmp_path.iterdir()] == ["agent_results_cache.json"]
+
+    reloaded = MasterAgent(cache_dir=str(tmp_path))
+    assert list(reloaded._agent_cache) == ["market_analysis|DrugA|DiseaseB"]
+    assert reloaded._get_cached_agent_result("market_analysis|DrugA|DiseaseB") == mock_agent_result
+
+async def test_agent_cache_written_once_per_analysis(tmp_path, master_agent):
+    """The cache file is rewritten once per analysis, not once per agent."""
+    master_agent._agent_cache_file = str(tmp_path / "agent_results_cache.json")
+    with patch.object(master_agent, "_save_agent_cache", wraps=master_agent._save_agent_cache) as save:
+        await master_agent.analyze_repurposing_async("DrugA", "DiseaseB")
+        assert save.call_count == 1
+        await master_agent.compare_molecules_async(["DrugC", "DrugD"], "DiseaseB")
+        assert save.call_count == 2
+
+    reloaded = MasterAgent(cache_dir=str(tmp_path))
+    assert len(reloaded._agent_cache) == 3 * len(master_agent.agents)
+
+def test_agent_cache_is_bounded_without_a_file(master_agent, mock_agent_result):
+    """The in-memory cache drops its oldest entries beyond AGENT_CACHE_SIZE."""
+    master_agent.AGENT_CACHE_SIZE = 2
+    for key in ("a|1", "b|1", "a|1", "c|1"):
+        master_agent._set_cached_agent_result(key, mock_agent_result)
+
+    assert list(master_agent._agent_cache) == ["a|1", "c|1"]
+
+async def test_cached_agent_result_is_not_shared_with_callers(master_agent):
+    """Mutating an agent result doesn't change later cache hits."""
+    first = await master_agent.analyze_repurposing_async("DrugA", "DiseaseB")
+    first["market_analysis"]["findings"].clear()
+    second = await master_agent.analyze_repurposing_async("DrugA", "DiseaseB")
+    second["market_analysis"]["opportunity_score"] = 0
+    third = await master_agent.analyze_repurposing_async("DrugA", "DiseaseB")
+
+    assert master_agent.agents["market_analysis"].analyze_async.await_count == 1
+    assert len(third["market_analysis"]["findings"]) == 2
+    assert third["market_analysis"]["opportunity_score"] == 75
+
+async def test_agent_lock_survives_handoff_to_waiter(master_agent):
+    """A caller arriving while another waits on a key shares that key's lock."""
+    running = peak = 0
+
+    async def failing(*args, **kwargs):
+        # Errors aren't cached, so every caller reaches the agent
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {"error": "unavailable", "confidence": 0.0}
+
+    agent = master_agent.agents["market_analysis"]
+    agent.analyze_async.side_effect = failing
+    run = lambda: asyncio.ensure_future(
+        master_agent._run_agent_async("market_analysis", agent, "DrugA", "DiseaseB")
+    )
+    first, second = run(), run()
+    await first
+    # second has been woken but hasn't taken the lock yet
+    third = run()
+    await asyncio.gather(second, third)
+
+    assert agent.analyze_async.await_count == 3
+    assert peak == 1
+    assert master_agent._agent_locks == {}
+
+def test_cached_synthesis_is_not_shared_with_callers(master_agent, mock_agent_result):
+    """Mutating a returned synthesis doesn't change later cache hits."""
+    results = {name: mock_agent_result.copy() for name in master_agent.agents}
+    first = master_agent.synthesize_results(results)
+    expected = copy.deepcopy(first["strengths"])
+    first["strengths"].append("mutated by caller")
+
+    assert master_agent.synthesize_results(results)["strengths"] == expected
+
+async def test_fan_out_leaves_loop_task_factory_alone(master_agent):
+    """Running agents doesn't change the caller's event loop."""
+    loop = asyncio.get_running_loop()
+    factory = loop.get_task_factory()
+
+    await master_agent.analyze_repurposing_async("DrugA", "DiseaseB")
+    await master_agent.compare_molecules_async(["DrugA", "DrugB"], "DiseaseB")
+
+    assert loop.get_task_factory() is factory
+
+@pytest.mark.skipif(sys.version_info < (3, 12), reason="eager tasks need Python 3.12+")
+async def test_agent_tasks_start_eagerly(master_agent, mock_agent_result):
+    """Agent tasks that never block finish as soon as they are created."""
+    agent = master_agent.agents["market_analysis"]
+    task = _create_eager_task(master_agent._run_agent_async("market_analysis", agent, "DrugA", "DiseaseB"))
+
+    assert task.done()
+    assert task.result() == mock_agent_result
+    assert asyncio.get_running_loop().get_task_factory() is None
+
 async def test_compare_molecules_async(master_agent):
     """Scenario 7: Compare mode with 2 molecules."""
     molecules = ["DrugA", "DrugB"]
@@ -117,7 +256,16 @@ async def test_compare_molecules_async(master_agent):
     assert "best_candidates" in comp_synth
     assert len(comp_synth["comparison"]) == 2
 
-@pytest.mark.asyncio
+async def test_compare_molecules_async_dedupes(master_agent):
+    """Repeated molecules are analyzed once and listed once."""
+    with patch.object(master_agent, "analyze_repurposing_async",
+                      wraps=master_agent.analyze_repurposing_async) as analyze:
+        result = await master_agent.compare_molecules_async(["DrugA", "DrugB", "DrugA"], "DiseaseC")
+
+    assert analyze.call_count == 2
+    assert result["comparison_metadata"]["molecules"] == ["DrugA", "DrugB"]
+    assert len(result["comparison_synthesis"]["comparison"]) == 2
+
 async def test_progress_tracking(master_agent):
     """Scenario 5: Progress tracking updates correctly."""
     # Check initial state
@@ -129,7 +277,6 @@ async def test_progress_tracking(master_agent):
     # Check final state (all Complete)
     assert all(status == "Complete" for status in master_agent.progress.values())
 
-@pytest.mark.asyncio
 async def test_rate_limit_fallback_logic(master_agent):
     """Scenario 3: Rate limit fallback (simulated logic check)."""
     # NOTE: The MasterAgent itself doesn't have explicit logic to retry with fallback 
@@ -168,3 +315,112 @@ def test_synthesis_logic(master_agent):
     
     # Should detect patent strength
     assert "Active patent protection" in synth["strengths"]
+
+def test_synthesis_findings_soa_matches_dicts(master_agent, mock_agent_result):
+    """Findings given as aligned strength/sign arrays synthesize identically."""
+    findings = mock_agent_result["findings"]
+    soa_result = {
+        **mock_agent_result,
+        "findings_soa": (
+            np.array([f["evidence_strength"] for f in findings], dtype=np.int16),
+            np.array([f["is_positive"] for f in findings], dtype=bool),
+        ),
+    }
+    names = list(master_agent.agents)
+    
+    dict_synth = master_agent.synthesize_results({name: mock_agent_result for name in names})
+    soa_synth = master_agent.synthesize_results({name: soa_result for name in names})
+    
+    dict_synth.pop("timestamp")
+    soa_synth.pop("timestamp")
+    assert soa_synth == dict_synth
+
+def test_agent_confidences_as_rows(master_agent):
+    """Agent confidences are compact tuples that project to UI rows on demand."""
+    synth = master_agent.synthesize_results({"patent_analysis": {"confidence": 0.9}})
+
+    first = synth["agent_confidences"][0]
+    assert first == ("Patent Analysis", 90, 0.25)
+    rows = master_agent.as_rows(synth["agent_confidences"])
+    assert rows[0] == {"agent": "Patent Analysis", "confidence": 90, "weight": 0.25}
+    # Rows saved by older versions are passed through unchanged
+    assert master_agent.as_rows([rows[0]]) == [rows[0]]
+
+def test_synthesis_cache_reuses_result(master_agent):
+    """Repeated synthesis of the same results only computes once per strategy."""
+    results = {
+        "patent_analysis": {"confidence": 0.9, "patent_status": "Active"},
+        "clinical_analysis": {"confidence": 0.7},
+        "molecule": "Test",
+        "disease": "Test",
+    }
+
+    with patch.object(master_agent, "_compute_synthesis", wraps=master_agent._compute_synthesis) as compute:
+        first = master_agent.synthesize_results(results, AnalysisStrategy.STANDARD)
+        # A new timestamp alone must not defeat the cache
+        second = master_agent.synthesize_results({**results, "timestamp": "later"}, AnalysisStrategy.STANDARD)
+        master_agent.synthesize_results(results, AnalysisStrategy.CONSERVATIVE)
+
+    assert compute.call_count == 2
+    assert first["recommendation"] == second["recommendation"]
+    assert first["confidence"] == second["confidence"]
+
+async def test_iter_agent_results_yields_in_completion_order(master_agent, mock_agent_result):
+    """A slow agent does not hold back results from the others."""
+    async def slow_analysis(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        return mock_agent_result.copy()
+
+    master_agent.agents["web_analysis"].analyze_async.side_effect = slow_analysis
+
+    names = [name async for name, _ in master_agent.iter_agent_results("DrugA", "DiseaseB")]
+
+    assert names[-1] == "web_analysis"
+    assert sorted(names) == sorted(master_agent.agents)
+
+async def test_agent_results_cached_per_molecule_disease(master_agent):
+    """A repeated analysis reuses agent results; failures are retried."""
+    master_agent.agents["market_analysis"].analyze_async.side_effect = [
+        asyncio.TimeoutError(), {"confidence": 0.6}, {"confidence": 0.6}
+    ]
+
+    await master_agent.analyze_repurposing_async("DrugA", "DiseaseB")
+    await master_agent.analyze_repurposing_async("DrugA", "DiseaseB")
+    await master_agent.analyze_repurposing_async("DrugA", "DiseaseC")
+
+    assert master_agent.agents["clinical_analysis"].analyze_async.await_count == 2
+    assert master_agent.agents["market_analysis"].analyze_async.await_count == 3
+
+def test_analyze_repurposing_sync(master_agent):
+    """The sync wrapper runs the async analysis when no loop is running."""
+    result = master_agent.analyze_repurposing("DrugA", "DiseaseB")
+    assert result["molecule"] == "DrugA"
+
+async def test_analyze_repurposing_sync_rejects_running_loop(master_agent):
+    """The sync wrapper refuses to block a running event loop."""
+    with pytest.raises(RuntimeError, match="analyze_repurposing_async"):
+        master_agent.analyze_repurposing("DrugA", "DiseaseB")
+
+def test_agents_are_built_lazily():
+    """Worker agents are only constructed when first looked up."""
+    factories = {name: MagicMock() for name in MasterAgent._AGENT_FACTORIES}
+    with patch.dict(MasterAgent._AGENT_FACTORIES, factories):
+        agent = MasterAgent()
+        assert list(agent.agents) == list(factories)
+        assert not any(factory.called for factory in factories.values())
+
+        assert agent.agents["patent_analysis"] is agent.agents["patent_analysis"]
+        assert factories["patent_analysis"].call_count == 1
+        assert not factories["market_analysis"].called
+
+async def test_mock_mode_skips_agent_dispatch(monkeypatch):
+    """With MOCK_AGENTS=1 the constant mock result is used without running agents."""
+    monkeypatch.setenv("MOCK_AGENTS", "1")
+    agent = MasterAgent()
+
+    result = await agent.analyze_repurposing_async("DrugA", "DiseaseB")
+
+    assert result["patent_analysis"]["patent_status"] == "Active"
+    assert result["pdf_report"] == "mock_report.pdf"
+    assert all(status == "Complete" for status in agent.progress.values())
+    assert not any(mock.analyze_async.await_count for mock in agent.agents.values())
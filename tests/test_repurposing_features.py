@@ -0,0 +1,34 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# The training scripts import each other as top-level modules
+scripts_dir = Path(__file__).parent.parent / "scripts"
+sys.path.append(str(scripts_dir))
+
+pytest.importorskip("sklearn")
+pytest.importorskip("xgboost")
+pytest.importorskip("joblib")
+
+from generate_repurposing_dataset import generate_dataset
+from repurposing_features import PHASE_ORDER, to_xgb_frame
+from train_repurposing_model import load_and_preprocess_data
+
+def test_to_xgb_frame_accepts_preprocessed_features(tmp_path, monkeypatch):
+    """to_xgb_frame works on the float32 frame training actually produces."""
+    monkeypatch.chdir(tmp_path)
+    generate_dataset()
+    X, _, _ = load_and_preprocess_data("data/repurposing_training_data.parquet")
+    assert X["phase_started_encoded"].dtype == np.float32
+
+    frame = to_xgb_frame(X)
+
+    assert list(frame.columns) == [
+        "phase_started" if c == "phase_started_encoded" else c for c in X.columns
+    ]
+    assert isinstance(frame["phase_started"].dtype, pd.CategoricalDtype)
+    assert list(frame["phase_started"].cat.categories) == PHASE_ORDER
+    np.testing.assert_array_equal(frame["phase_started"].cat.codes, X["phase_started_encoded"].astype("int8"))
@@ -5,11 +5,100 @@ This module provides a D3.js-based interactive network graph for visualizing
 patent landscapes, relationships, and FTO risks.
 """
 
+import functools
 import json
+import math
+from pathlib import Path
+import networkx as nx
+import streamlit as st
 import streamlit.components.v1 as components
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 
-def render_patent_network(patents: List[Dict[str, Any]], molecule_name: str, height: int = 600):
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Space left around the layout for node radii and labels
+LAYOUT_MARGIN = 40
+# Above this many patents the spring layout (quadratic in the node count)
+# is replaced by an even spread over a disk
+LARGE_NETWORK_PATENTS = 500
+# Angle between successive patents in the disk layout
+GOLDEN_ANGLE = math.pi * (3 - math.sqrt(5))
+
+@st.cache_data(max_entries=32)
+def _star_layout(patent_ids: Tuple[str, ...], fixed_pos: Tuple[Tuple[str, float, float], ...] = ()) -> Dict[str, Tuple[float, float]]:
+    """
+    Spring layout of the molecule (CENTER) linked to each patent, centred on
+    the origin at unit scale. Seeded, so the same patents always get the same
+    positions; nodes in fixed_pos (id, x, y) stay where they are and only the
+    remaining patents are placed around them.
+    """
+    G = nx.Graph()
+    G.add_node("CENTER")
+    for p_id in patent_ids:
+        G.add_edge("CENTER", p_id)
+    if fixed_pos:
+        start = {node: (x, y) for node, x, y in fixed_pos}
+        pos = nx.spring_layout(G, pos=start, fixed=list(start), seed=42, iterations=200)
+    else:
+        pos = nx.spring_layout(G, seed=42, iterations=200)
+    return {node: (float(x), float(y)) for node, (x, y) in pos.items()}
+
+@functools.lru_cache(maxsize=1)
+def _load_template() -> str:
+    """
+    HTML/JS page for the network, read once. A str.format template with
+    {json_data}, {height}, {debug_status} and {log_script} fields; literal
+    braces are doubled.
+    """
+    return (Path(__file__).parent / "patent_network.html").read_text(encoding="utf-8")
+
+def _disk_layout(patent_ids: Tuple[str, ...]) -> Dict[str, Tuple[float, float]]:
+    """
+    Patents spread evenly over the unit disk around CENTER (a sunflower
+    spiral), in O(n) for portfolios too large for the spring layout.
+    """
+    n = len(patent_ids)
+    pos = {"CENTER": (0.0, 0.0)}
+    for i, p_id in enumerate(patent_ids, start=1):
+        r = math.sqrt(i / n)
+        pos[p_id] = (r * math.cos(i * GOLDEN_ANGLE), r * math.sin(i * GOLDEN_ANGLE))
+    return pos
+
+# Debug overlay listing the page's log() messages; left out of the page
+# unless render_patent_network is called with debug=True
+_DEBUG_STATUS_DIV = """    <div id="debug-status" style="position:absolute; top:50px; left:10px; color:#ffcc00; font-family:monospace; font-size:12px; pointer-events:none;">Initializing...</div>
+"""
+_DEBUG_LOG_SCRIPT = """      const statusDiv = document.getElementById('debug-status');
+      function log(msg) {
+        const line = document.createElement('div');
+        line.textContent = msg;
+        statusDiv.appendChild(line);
+      }
+
+      window.onerror = function(message, source, lineno, colno, error) {
+          log("JS Error: " + message + " at line " + lineno);
+      };
+"""
+_NO_LOG_SCRIPT = """      function log(msg) {}
+"""
+
+def _patent_fields(p: Dict[str, Any]) -> Tuple[Any, ...]:
+    """The values of a patent dict the graph uses, with their defaults."""
+    return (
+        p.get('patent_number', 'Unknown'),
+        p.get('status', 'Active'),
+        p.get('risk_level', ''),
+        p.get('title'),
+        p.get('assignee'),
+        p.get('expiration_date'),
+        p.get('url', '#'),
+    )
+
+def render_patent_network(patents: List[Dict[str, Any]], molecule_name: str, height: int = 600,
+                          debug: bool = False):
     """
     Renders an interactive D3.js network graph of patents.
     
@@ -17,6 +106,41 @@ def render_patent_network(patents: List[Dict[str, Any]], molecule_name: str, hei
         patents: List of patent dictionaries (from PatentAgent).
         molecule_name: Name of the central drug molecule.
         height: Height of the component in pixels.
+        debug: Overlay the page's status and JS error log on the graph.
+    """
+    # Reruns with the same patents reuse the generated HTML
+    patent_key = tuple(_patent_fields(p) for p in patents)
+    node_ids = ("CENTER",) + tuple(fields[0] for fields in patent_key)
+    
+    # When the patent list changes, patents already on screen keep their
+    # positions and only the added ones are laid out
+    layouts = st.session_state.setdefault("_patent_network_layouts", {})
+    if len(patent_key) > LARGE_NETWORK_PATENTS:
+        pos = _disk_layout(node_ids[1:])
+    else:
+        previous = layouts.get(molecule_name, {})
+        fixed_pos = tuple((n, *previous[n]) for n in dict.fromkeys(node_ids) if n in previous)
+        pos = _star_layout(node_ids[1:], fixed_pos if len(fixed_pos) > 1 else ())
+    layouts[molecule_name] = pos
+    
+    positions = tuple(pos[n] for n in node_ids)
+    html_code = _build_patent_network_html(patent_key, molecule_name, height, positions, debug)
+    
+    # Render component
+    components.html(html_code, height=height, scrolling=False)
+
+@st.cache_data(max_entries=32)
+def _build_patent_network_html(patent_key: Tuple[Tuple[Any, ...], ...], molecule_name: str, height: int,
+                               positions: Tuple[Tuple[float, float], ...], debug: bool = False) -> str:
+    """
+    Self-contained HTML page for the patent network.
+    
+    Args:
+        patent_key: One _patent_fields() tuple per patent.
+        molecule_name: Name of the central drug molecule.
+        height: Height of the component in pixels.
+        positions: Unit-scale (x, y) of the drug node followed by each patent.
+        debug: Include the debug status overlay and its log() output.
     """
     
     # 1. Transform Data for D3
@@ -34,8 +158,7 @@ def render_patent_network(patents: List[Dict[str, Any]], molecule_name: str, hei
     })
     
     # Patent Nodes
-    for p in patents:
-        p_id = p.get('patent_number', 'Unknown')
+    for p_id, status, risk_level, title, assignee, expiration_date, url in patent_key:
         
         # Determine Color based on Risk/Status
         # Logic: Expired -> Green, Active + High Risk (hypothetical field) -> Red, Active -> Orange
@@ -43,16 +166,15 @@ def render_patent_network(patents: List[Dict[str, Any]], molecule_name: str, hei
         # If 'fto_status' was passed per patent it would be better, but we often get it aggregate.
         # We'll assume if it's in the list it's relevant.
         
-        status = p.get('status', 'Active')
         color = "#F1C40F" # Yellow/Orange (Caution)
         
         if status == "Expired":
             color = "#27AE60" # Green (Safe)
-        elif "High" in p.get('risk_level', ''): # Hypothetical field if available
+        elif "High" in risk_level: # Hypothetical field if available
             color = "#E74C3C" # Red (Danger)
             
         # Tooltip content
-        tooltip = f"Patent: {p_id}\nTitle: {p.get('title')}\nAssignee: {p.get('assignee')}\nExpires: {p.get('expiration_date')}"
+        tooltip = f"Patent: {p_id}\nTitle: {title}\nAssignee: {assignee}\nExpires: {expiration_date}"
             
         nodes.append({
             "id": p_id,
@@ -62,7 +184,7 @@ def render_patent_network(patents: List[Dict[str, Any]], molecule_name: str, hei
             "radius": 12,
             "color": color,
             "tooltip": tooltip,
-            "url": p.get('url', '#')
+            "url": url
         })
         
         # Link to Center
@@ -72,190 +194,24 @@ def render_patent_network(patents: List[Dict[str, Any]], molecule_name: str, hei
             "value": 1
         })
         
-    graph_data = {"nodes": nodes, "links": links}
-    json_data = json.dumps(graph_data)
-
-    # 2. D3.js HTML Template
-    html_code = f"""
-    <!DOCTYPE html>
-    <html>
-      <head>
-        <meta charset="utf-8">
-        <script src="https://d3js.org/d3.v6.min.js"></script>
-        <style>
-          body {{ margin: 0; background-color: #0E1117; font-family: sans-serif; overflow: hidden; }}
-          .tooltip {{
-            position: absolute;
-            text-align: left;
-            padding: 8px;
-            font-size: 12px;
-            background: rgba(0, 0, 0, 0.8);
-            color: #fff;
-            border-radius: 4px;
-            pointer-events: none;
-            opacity: 0;
-            transition: opacity 0.2s;
-            max-width: 300px;
-            z-index: 10;
-          }}
-          svg {{ width: 100%; height: 100%; }}
-          circle {{ stroke: #fff; stroke-width: 1.5px; cursor: pointer; }}
-          line {{ stroke: #999; stroke-opacity: 0.6; }}
-          text {{ fill: #ddd; font-size: 10px; pointer-events: none; }}
-          
-          /* Legend */
-          .legend {{ position: absolute; top: 10px; left: 10px; background: rgba(255,255,255,0.1); padding: 10px; border-radius: 5px; }}
-          .legend-item {{ display: flex; align-items: center; margin-bottom: 5px; color: #eee; font-size: 12px; }}
-          .legend-color {{ width: 12px; height: 12px; border-radius: 50%; margin-right: 8px; }}
-        </style>
-      </head>
-      <body>
-        <div id="graph-container" style="width:100%; height:{height}px;"></div>
-        <div id="debug-status" style="position:absolute; top:50px; left:10px; color:#ffcc00; font-family:monospace; font-size:12px; pointer-events:none;">Initializing...</div>
-        <div class="tooltip" id="tooltip"></div>
-        
-        <div class="legend">
-            <div class="legend-item"><div class="legend-color" style="background:#2E86C1"></div>Target Molecule</div>
-            <div class="legend-item"><div class="legend-color" style="background:#F1C40F"></div>Active Patent (Caution)</div>
-            <div class="legend-item"><div class="legend-color" style="background:#27AE60"></div>Expired/Low Risk</div>
-            <div class="legend-item"><div class="legend-color" style="background:#E74C3C"></div>High Risk</div>
-        </div>
-
-        <script>
-          const statusDiv = document.getElementById('debug-status');
-          function log(msg) {{ statusDiv.innerHTML += "<br>" + msg; }}
-          
-          window.onerror = function(message, source, lineno, colno, error) {{
-              log("JS Error: " + message + " at line " + lineno);
-          }};
-
-          try {{
-              if (typeof d3 === 'undefined') {{
-                  log("Error: D3.js library failed to load.");
-                  throw new Error("D3 missing");
-              }}
-              
-              const data = {json_data};
-              const width = window.innerWidth || 800; // Fallback width
-              const height = {height};
-              
-              log("Data loaded. Nodes: " + data.nodes.length + ", Width: " + width);
-
-              const svg = d3.select("#graph-container").append("svg")
-                  .attr("viewBox", [0, 0, width, height]);
-                  
-              // Zoom capability
-              const g = svg.append("g");
-              svg.call(d3.zoom()
-                  .extent([[0, 0], [width, height]])
-                  .scaleExtent([0.1, 8])
-                  .on("zoom", ({{transform}}) => g.attr("transform", transform)));
+    # Positions are computed here once instead of by a force simulation in
+    # every browser; the client offsets them to the canvas centre
+    scale = max(height / 2 - LAYOUT_MARGIN, 1)
+    for n, (x, y) in zip(nodes, positions):
+        n["x"], n["y"] = round(x * scale, 2), round(y * scale, 2)
 
-              const simulation = d3.forceSimulation(data.nodes)
-                  .force("link", d3.forceLink(data.links).id(d => d.id).distance(100))
-                  .force("charge", d3.forceManyBody().strength(-300))
-                  .force("center", d3.forceCenter(width / 2, height / 2))
-                  .force("collide", d3.forceCollide().radius(d => d.radius + 5));
-
-              const link = g.append("g")
-                  .attr("stroke", "#999")
-                  .attr("stroke-opacity", 0.6)
-                .selectAll("line")
-                .data(data.links)
-                .join("line")
-                  .attr("stroke-width", d => Math.sqrt(d.value));
-
-              const node = g.append("g")
-                  .attr("stroke", "#fff")
-                  .attr("stroke-width", 1.5)
-                .selectAll("circle")
-                .data(data.nodes)
-                .join("circle")
-                  .attr("r", d => d.radius)
-                  .attr("fill", d => d.color)
-                  .call(drag(simulation));
-
-              // Labels
-              const labels = g.append("g")
-                .selectAll("text")
-                .data(data.nodes)
-                .join("text")
-                .text(d => d.label)
-                .attr("dx", 15)
-                .attr("dy", 4);
-
-              // Tooltip logic
-              const tooltip = d3.select("#tooltip");
-              
-              node.on("mouseover", (event, d) => {{
-                  tooltip.transition().duration(200).style("opacity", .9);
-                  tooltip.html(d.tooltip ? d.tooltip.replace(/\\n/g, "<br>") : d.id)
-                    .style("left", (event.pageX + 10) + "px")
-                    .style("top", (event.pageY - 28) + "px");
-                  
-                  // Highlight connections
-                  link.attr("stroke", l => (l.source === d || l.target === d) ? "#fff" : "#999")
-                      .attr("stroke-opacity", l => (l.source === d || l.target === d) ? 1 : 0.1);
-              }})
-              .on("mouseout", d => {{
-                  tooltip.transition().duration(500).style("opacity", 0);
-                  link.attr("stroke", "#999").attr("stroke-opacity", 0.6);
-              }})
-              .on("click", (event, d) => {{
-                  if (d.url && d.url !== '#') {{
-                      window.open(d.url, '_blank');
-                  }}
-              }});
-
-              simulation.on("tick", () => {{
-                link
-                    .attr("x1", d => d.source.x)
-                    .attr("y1", d => d.source.y)
-                    .attr("x2", d => d.target.x)
-                    .attr("y2", d => d.target.y);
-
-                node
-                    .attr("cx", d => d.x)
-                    .attr("cy", d => d.y);
-                    
-                labels
-                    .attr("x", d => d.x)
-                    .attr("y", d => d.y);
-              }});
+    graph_data = {"nodes": nodes, "links": links}
+    if orjson is not None:
+        json_data = orjson.dumps(graph_data).decode("utf-8")
+    else:
+        json_data = json.dumps(graph_data)
+    # Embedded in a <script type="application/json"> tag and read with
+    # JSON.parse; a "</script>" in a title would otherwise close that tag
+    json_data = json_data.replace("</", "<\\/")
 
-              function drag(simulation) {{
-                function dragstarted(event) {{
-                  if (!event.active) simulation.alphaTarget(0.3).restart();
-                  event.subject.fx = event.subject.x;
-                  event.subject.fy = event.subject.y;
-                }}
-                
-                function dragged(event) {{
-                  event.subject.fx = event.x;
-                  event.subject.fy = event.y;
-                }}
-                
-                function dragended(event) {{
-                  if (!event.active) simulation.alphaTarget(0);
-                  event.subject.fx = null;
-                  event.subject.fy = null;
-                }}
-                
-                return d3.drag()
-                    .on("start", dragstarted)
-                    .on("drag", dragged)
-                    .on("end", dragended);
-              }}
-              
-              log("Render complete.");
-              
-          }} catch (e) {{
-              log("Exec Error: " + e.message);
-          }}
-        </script>
-      </body>
-    </html>
-    """
-    
-    # Render component
-    components.html(html_code, height=height, scrolling=False)
+    return _load_template().format(
+        json_data=json_data,
+        height=height,
+        debug_status=_DEBUG_STATUS_DIV if debug else "",
+        log_script=_DEBUG_LOG_SCRIPT if debug else _NO_LOG_SCRIPT,
+    )
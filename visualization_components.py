@@ -3,10 +3,38 @@ visualization_components.py
 
 Contains functions for creating interactive visualizations for the dashboard.
 """
+import functools
+import io
+import json
+import streamlit as st
+import streamlit.components.v1 as components
 import plotly.graph_objects as go
-import plotly.express as px
-import pandas as pd
-from typing import Dict, Any, List, Optional
+import plotly.io as pio
+from plotly.offline import get_plotlyjs, get_plotlyjs_version
+from pathlib import Path
+from typing import Dict, Any, List, Optional, TextIO, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Layout shared by the dashboard figures; each factory adds its own
+# height, titles and any overrides
+BASE_LAYOUT = dict(
+    margin=dict(l=40, r=40, t=40, b=40),
+    showlegend=False,
+)
+
+# Radar axes: (label, (analysis section, score field), default score)
+RISK_RADAR_SPECS = (
+    ('Patent Risk', ('patent_analysis', 'risk_score'), 50),
+    ('Clinical Risk', ('clinical_analysis', 'risk_score'), 50),
+    ('Market Risk', ('market_analysis', 'risk_score'), 50),
+    ('Safety Risk', ('safety_analysis', 'risk_score'), 50),
+    ('Competition', ('market_analysis', 'competition_score'), 50),
+    ('Strategic Fit', ('internal_analysis', 'strategic_fit_score'), 50),
+)
 
 def create_risk_radar(analysis_results: Dict[str, Any]) -> go.Figure:
     """
@@ -19,23 +47,26 @@ def create_risk_radar(analysis_results: Dict[str, Any]) -> go.Figure:
         plotly.graph_objects.Figure: Interactive radar chart
     """
     # Extract risk scores from agent outputs
-    risk_scores = {
-        'Patent Risk': analysis_results.get('patent_analysis', {}).get('risk_score', 50),
-        'Clinical Risk': analysis_results.get('clinical_analysis', {}).get('risk_score', 50),
-        'Market Risk': analysis_results.get('market_analysis', {}).get('risk_score', 50),
-        'Safety Risk': analysis_results.get('safety_analysis', {}).get('risk_score', 50),
-        'Competition': analysis_results.get('market_analysis', {}).get('competition_score', 50),
-        'Strategic Fit': analysis_results.get('internal_analysis', {}).get('strategic_fit_score', 50)
-    }
-    
-    categories = list(risk_scores.keys())
-    values = list(risk_scores.values())
+    scores = tuple(
+        analysis_results.get(section, {}).get(field, default)
+        for _, (section, field), default in RISK_RADAR_SPECS
+    )
+    return go.Figure(_risk_radar_spec(scores))
+
+@st.cache_data(max_entries=64)
+def _risk_radar_spec(scores: Tuple[Any, ...]) -> Dict[str, Any]:
+    """Plotly JSON for the risk radar, one score per RISK_RADAR_SPECS entry."""
+    categories = [label for label, _, _ in RISK_RADAR_SPECS]
+    values = list(scores)
+    # Close the radar
+    categories.append(categories[0])
+    values.append(values[0])
     
     fig = go.Figure()
     
     fig.add_trace(go.Scatterpolar(
-        r=values + [values[0]],  # Close the radar
-        theta=categories + [categories[0]],  # Close the radar
+        r=values,
+        theta=categories,
         fill='toself',
         name='Risk Score',
         line=dict(color='#636EFA'),
@@ -43,6 +74,7 @@ def create_risk_radar(analysis_results: Dict[str, Any]) -> go.Figure:
     ))
     
     fig.update_layout(
+        BASE_LAYOUT,
         polar=dict(
             radialaxis=dict(
                 visible=True,
@@ -56,12 +88,10 @@ def create_risk_radar(analysis_results: Dict[str, Any]) -> go.Figure:
                 direction="clockwise"
             )
         ),
-        showlegend=False,
-        margin=dict(l=40, r=40, t=40, b=40),
         height=400
     )
     
-    return fig
+    return fig.to_plotly_json()
 
 def create_timeline_gantt(analysis_results: Dict[str, Any]) -> go.Figure:
     """
@@ -77,13 +107,9 @@ def create_timeline_gantt(analysis_results: Dict[str, Any]) -> go.Figure:
     clinical_data = analysis_results.get('clinical_analysis', {})
     
     # Default timeline estimates (in months from now)
-    phases = [
-        dict(Task="Preclinical", Start=0, Finish=12, Resource="Phase"),
-        dict(Task="Phase 1", Start=12, Finish=24, Resource="Phase"),
-        dict(Task="Phase 2", Start=24, Finish=36, Resource="Phase"),
-        dict(Task="Phase 3", Start=36, Finish=60, Resource="Phase"),
-        dict(Task="FDA Review", Start=60, Finish=72, Resource="Phase")
-    ]
+    tasks = ["Preclinical", "Phase 1", "Phase 2", "Phase 3", "FDA Review"]
+    starts = [0, 12, 24, 36, 60]
+    durations = [12, 12, 12, 24, 12]
     
     # Update with actual data if available
     if 'estimated_timeline' in clinical_data:
@@ -91,8 +117,11 @@ def create_timeline_gantt(analysis_results: Dict[str, Any]) -> go.Figure:
         # This is a simplified example - adjust based on your actual data structure
         pass
     
-    df = pd.DataFrame(phases)
-    
+    return go.Figure(_timeline_gantt_spec(tuple(tasks), tuple(starts), tuple(durations)))
+
+@st.cache_data(max_entries=64)
+def _timeline_gantt_spec(tasks: Tuple[str, ...], starts: Tuple[int, ...], durations: Tuple[int, ...]) -> Dict[str, Any]:
+    """Plotly JSON for the development timeline, one bar per task."""
     # Define colors for each phase
     colors = {
         'Preclinical': '#636EFA',
@@ -102,26 +131,29 @@ def create_timeline_gantt(analysis_results: Dict[str, Any]) -> go.Figure:
         'FDA Review': '#FFA15A'
     }
     
-    fig = px.timeline(
-        df,
-        x_start="Start",
-        x_end="Finish",
-        y="Task",
-        color="Task",
-        color_discrete_map=colors,
-        title="Development Timeline"
-    )
+    # Horizontal bars offset by their start month draw the timeline directly,
+    # without going through a DataFrame and px.timeline
+    fig = go.Figure(go.Bar(
+        y=tasks,
+        x=durations,
+        base=starts,
+        orientation='h',
+        marker_color=[colors[t] for t in tasks],
+        customdata=[s + d for s, d in zip(starts, durations)],  # Finish month
+        hovertemplate='%{y}: months %{base}-%{customdata}<extra></extra>'
+    ))
     
     fig.update_yaxes(autorange="reversed")
     fig.update_layout(
+        BASE_LAYOUT,
         height=300,
         margin=dict(l=10, r=10, t=30, b=10),
-        showlegend=False,
+        title="Development Timeline",
         xaxis_title="Months from Now",
         yaxis_title=""
     )
     
-    return fig
+    return fig.to_plotly_json()
 
 def create_market_funnel(analysis_results: Dict[str, Any]) -> go.Figure:
     """
@@ -137,6 +169,11 @@ def create_market_funnel(analysis_results: Dict[str, Any]) -> go.Figure:
     
     # Default values (in billions)
     total_market = market_data.get('total_market_size', 50)  # Default $50B
+    return go.Figure(_market_funnel_spec(total_market))
+
+@st.cache_data(max_entries=64)
+def _market_funnel_spec(total_market: float) -> Dict[str, Any]:
+    """Plotly JSON for the market funnel of a total market size (billions USD)."""
     addressable_market = total_market * 0.3  # 30% of total market
     target_segment = addressable_market * 0.2  # 20% of addressable market
     
@@ -153,119 +190,166 @@ def create_market_funnel(analysis_results: Dict[str, Any]) -> go.Figure:
     ))
     
     fig.update_layout(
+        BASE_LAYOUT,
         title="Market Opportunity (Billions USD)",
         height=400,
-        margin=dict(l=40, r=40, t=40, b=40),
         yaxis_title="",
-        xaxis_title="Market Size (Billions USD)",
-        showlegend=False
+        xaxis_title="Market Size (Billions USD)"
     )
     
-    return fig
+    return fig.to_plotly_json()
 
-def export_dashboard(figures: Dict[str, go.Figure], filename: str = "dashboard.html") -> str:
-    """
-    Export the dashboard figures to an interactive HTML file.
-    
-    Args:
-        figures: Dictionary of {figure_name: figure_object}
-        filename: Output filename
-        
-    Returns:
-        str: Path to the exported HTML file
-    """
-    import plotly.io as pio
-    from pathlib import Path
-    
-    # Create HTML content
-    html_content = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Drug Repurposing Dashboard</title>
-        <script src="https://cdn.plot.ly/plotly-latest.min.js"></script>
-        <style>
-            body { font-family: Arial, sans-serif; margin: 0; padding: 20px; }
-            .dashboard-container { max-width: 1200px; margin: 0 auto; }
-            .dashboard-row { display: flex; margin-bottom: 20px; }
-            .dashboard-col { flex: 1; margin: 0 10px; }
-            .dashboard-widget { 
-                background: white; 
-                border-radius: 8px; 
-                box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                padding: 15px;
-                margin-bottom: 20px;
-            }
-            .widget-title { 
-                font-size: 18px; 
-                font-weight: bold; 
-                margin-bottom: 15px;
-                color: #2c3e50;
-            }
-        </style>
-    </head>
-    <body>
-        <div class="dashboard-container">
-            <h1>Drug Repurposing Analysis Dashboard</h1>
-            <div class="dashboard-row">
-                <div class="dashboard-col">
-                    <div class="dashboard-widget">
-                        <div class="widget-title">Risk Breakdown</div>
-                        <div id="risk-radar"></div>
-                    </div>
+# Exported charts are for viewing: no mode bar, and they resize with the page
+EXPORT_PLOT_CONFIG = {"displayModeBar": False, "responsive": True}
+
+def _plotly_js_url() -> str:
+    """CDN URL of the plotly.js release bundled with the installed plotly package."""
+    return f"https://cdn.plot.ly/plotly-{get_plotlyjs_version()}.min.js"
+
+def _figure_json(fig: go.Figure) -> str:
+    """Figure data/layout as a JS object literal, safe to embed in a <script>."""
+    json_data = None
+    if orjson is not None:
+        try:
+            json_data = orjson.dumps(fig.to_plotly_json(), option=orjson.OPT_SERIALIZE_NUMPY).decode()
+        except TypeError:
+            # Values orjson can't encode; plotly's encoder handles them
+            pass
+    if json_data is None:
+        json_data = pio.to_json(fig, validate=False)
+    # Keep a "</script>" inside a title or label from closing the script tag
+    return json_data.replace("</", "<\\/")
+
+# Static parts of the exported dashboard page; the figures' script goes between them
+_DASHBOARD_HEAD = """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Drug Repurposing Dashboard</title>
+    {plotly_js_tag}
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 0; padding: 20px; }}
+        .dashboard-container {{ max-width: 1200px; margin: 0 auto; }}
+        .dashboard-row {{ display: flex; margin-bottom: 20px; }}
+        .dashboard-col {{ flex: 1; margin: 0 10px; }}
+        .dashboard-widget {{ 
+            background: white; 
+            border-radius: 8px; 
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+            padding: 15px;
+            margin-bottom: 20px;
+        }}
+        .widget-title {{ 
+            font-size: 18px; 
+            font-weight: bold; 
+            margin-bottom: 15px;
+            color: #2c3e50;
+        }}
+    </style>
+</head>
+<body>
+    <div class="dashboard-container">
+        <h1>Drug Repurposing Analysis Dashboard</h1>
+        <div class="dashboard-row">
+            <div class="dashboard-col">
+                <div class="dashboard-widget">
+                    <div class="widget-title">Risk Breakdown</div>
+                    <div id="risk-radar"></div>
                 </div>
-                <div class="dashboard-col">
-                    <div class="dashboard-widget">
-                        <div class="widget-title">Market Opportunity</div>
-                        <div id="market-funnel"></div>
-                    </div>
+            </div>
+            <div class="dashboard-col">
+                <div class="dashboard-widget">
+                    <div class="widget-title">Market Opportunity</div>
+                    <div id="market-funnel"></div>
                 </div>
             </div>
-            <div class="dashboard-row">
-                <div class="dashboard-col">
-                    <div class="dashboard-widget">
-                        <div class="widget-title">Development Timeline</div>
-                        <div id="timeline-gantt"></div>
-                    </div>
+        </div>
+        <div class="dashboard-row">
+            <div class="dashboard-col">
+                <div class="dashboard-widget">
+                    <div class="widget-title">Development Timeline</div>
+                    <div id="timeline-gantt"></div>
                 </div>
             </div>
         </div>
-        <script>
-    """
+    </div>
+    <script>
+"""
+
+_DASHBOARD_TAIL = """
+    </script>
+</body>
+</html>
+"""
+
+@functools.lru_cache(maxsize=1)
+def _inline_plotly_js_tag() -> str:
+    """Script tag carrying the bundled plotly.js itself, built once."""
+    return f"<script>{get_plotlyjs()}</script>"
+
+def _write_dashboard(out: TextIO, figures: Dict[str, go.Figure], plotly_js_tag: str) -> None:
+    """Write the dashboard page for figures to a text stream, part by part."""
+    out.write(_DASHBOARD_HEAD.format(plotly_js_tag=plotly_js_tag))
     
     # Add figure data to the HTML
     for fig_name, fig in figures.items():
-        fig_json = fig.to_json()
-        html_content += f"var {fig_name} = {fig_json};\n"
-    
-    # Add plotly initialization
-    html_content += """
-            // Initialize all plots when the page loads
-            document.addEventListener('DOMContentLoaded', function() {
-    """
+        out.write(f"var {fig_name} = ")
+        out.write(_figure_json(fig))
+        out.write(";\n")
     
-    # Add plot initialization for each figure
-    for fig_name in figures.keys():
+    # Initialize all plots when the page loads
+    # (Plotly.react patches an existing plot in place if the page re-runs it)
+    out.write("document.addEventListener('DOMContentLoaded', function() {\n")
+    out.write(f"    var config = {json.dumps(EXPORT_PLOT_CONFIG)};\n")
+    for fig_name in figures:
         div_id = fig_name.replace('_', '-')  # Convert to HTML ID format
-        html_content += f"""
-                Plotly.newPlot('{div_id}', {fig_name}.data, {fig_name}.layout);
-        """
+        out.write(f"    Plotly.react('{div_id}', {fig_name}.data, {fig_name}.layout, config);\n")
+    out.write("});\n")
     
     # Close the script and HTML
-    html_content += """
-            });
-        </script>
-    </body>
-    </html>
+    out.write(_DASHBOARD_TAIL)
+
+def export_dashboard(figures: Dict[str, go.Figure], filename: str = "dashboard.html") -> str:
     """
+    Export the dashboard figures to an interactive HTML file.
     
+    Args:
+        figures: Dictionary of {figure_name: figure_object}
+        filename: Output filename
+        
+    Returns:
+        str: Path to the exported HTML file
+    """
     # Create output directory if it doesn't exist
     output_dir = Path("exports")
     output_dir.mkdir(exist_ok=True)
     
-    # Write to file
+    # Stream each part straight to the file rather than building the whole
+    # document (every figure's JSON included) as one string first. The file
+    # is downloaded on its own, so plotly.js comes from the CDN rather than
+    # a local path that wouldn't travel with it
     output_path = output_dir / filename
     with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+        _write_dashboard(f, figures, f'<script src="{_plotly_js_url()}" defer></script>')
     
     return str(output_path.absolute())
+
+def render_dashboard(figures: Dict[str, go.Figure], height: int = 1000) -> None:
+    """
+    Render the risk radar, market funnel and development timeline in the
+    Streamlit app as one HTML component.
+    
+    This is the preferred way to show the dashboard: Streamlit sends and
+    mounts a single element instead of one per chart. The create_* factories
+    build the figures.
+    
+    Args:
+        figures: Dictionary of {figure_name: figure_object} with the
+            risk_radar, market_funnel and timeline_gantt figures
+        height: Height of the component in pixels
+    """
+    # plotly.js is inlined rather than fetched from the CDN, so the
+    # dashboard still draws offline or behind a proxy
+    buf = io.StringIO()
+    _write_dashboard(buf, figures, _inline_plotly_js_tag())
+    components.html(buf.getvalue(), height=height, scrolling=True)